@@ -1,3 +1,4 @@
+import argparse
 import logging
 import os
 import sys
@@ -5,35 +6,43 @@ import sys
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCard, AgentCapabilities, AgentSkill
-from google.adk import Runner
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.adk.artifacts import InMemoryArtifactService
 from a2a.server.tasks import TaskUpdater
-from a2a.types import TaskState, TextPart
-from google.genai import types
+from a2a.types import DataPart, TaskState, TextPart
+from search_agent.intent import parse_intent
+from search_agent.llm import LLM_ENABLED, BudgetExceeded, LlmGateway
+from search_agent.telemetry import MetricsMiddleware, metrics_endpoint, stage
 
 # Reuse simplified executor logic (ideally this should be shared or imported)
 from a2a.server.agent_execution import AgentExecutor
 
 # Copying simplified executor for standalone capability
 class ApplyAgentExecutor(AgentExecutor):
-    def __init__(self, runner: Runner, card: AgentCard):
-        self.runner = runner
+    def __init__(self, runner_factory, card: AgentCard):
+        self._runner_factory = runner_factory
+        self._runner = None
         self._card = card
+        self._llm = LlmGateway('apply_agent', lambda: self.runner)
+
+    @property
+    def runner(self):
+        """The ADK Runner, built on first use: parsed commands never need the LLM stack."""
+        if self._runner is None:
+            self._runner = self._runner_factory()
+        return self._runner
 
     async def execute(self, context, event_queue, response_trace=None):
+        with stage("apply_agent.execute"):
+            await self._execute(context, event_queue)
+
+    async def _execute(self, context, event_queue):
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
         if not context.current_task:
             await updater.update_status(TaskState.submitted)
         await updater.update_status(TaskState.working)
 
-        # Simplified logic: bypass LLM for verification
         text = ""
         for part in context.message.parts:
             if part.root.kind == 'text':
@@ -41,35 +50,135 @@ class ApplyAgentExecutor(AgentExecutor):
         
         print(f"Executing Apply Agent with message: {text}")
         
-        if "apply" in text.lower():
-            # Mock extraction of job_id
-            import re
-            match = re.search(r"ID (\S+)", text)
-            job_id = match.group(1) if match else "unknown"
-            
-            from .apply_tools import apply_for_job
-            # In a real scenario, it would call Search Agent here if details missing
-            # For this mock, we just call the tool with dummy details/content
-            result = apply_for_job(job_id, "Mock Job Details", "Mock Resume Content")
-            response_text = f"Application request processed for job {job_id}. Status: {result}"
+        # Well-formed commands are routed without the LLM; everything else goes to the Runner
+        intent = parse_intent(text)
+        action = intent.action if intent else None
+        if action == "rank":
+            await self._execute_rank(updater, intent.resume, intent.top_k)
+            return
+        if action == "apply_bulk":
+            await self._execute_bulk(updater, list(intent.job_ids), intent.resume)
+            return
+        if action == "apply":
+            await self._execute_apply(updater, intent.job_ids[0], intent.resume)
+            return
+        await self._execute_llm(updater, context, text)
+
+    async def _execute_apply(self, updater, job_id: str, resume_filename: str):
+        """Applies for one job with the named resume, using the job's details from the Search Agent."""
+        import asyncio
+        import json
+        from .apply_tools import RESUMES_DIR, apply_for_job, get_jobs_details_from_search_agent, read_resume
+
+        error = None
+        if not resume_filename:
+            error = f"no resume given; try \"Apply for job ID {job_id} using my_resume.txt\"."
+        elif not os.path.exists(os.path.join(RESUMES_DIR, resume_filename)):
+            error = f"Resume file {resume_filename} not found."
         else:
-            response_text = f"I received your message: {text}. I am an Apply Agent."
+            try:
+                jobs = await get_jobs_details_from_search_agent([job_id])
+            except Exception as e:
+                jobs = {}
+                error = f"Failed to communicate with Search Agent: {e}"
+            else:
+                if job_id not in jobs:
+                    error = f"Job with ID {job_id} not found."
+        if error:
+            await updater.add_artifact([TextPart(text=f"Failed to apply for Job {job_id}: {error}")])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+
+        resume_content = await asyncio.to_thread(read_resume, resume_filename)
+        # The store blocks until its writer has committed the application, so it runs off the event loop
+        result = await asyncio.to_thread(apply_for_job, job_id, json.dumps(jobs[job_id]), resume_content)
+        response_text = f"Application request processed for job {job_id}. Status: {result}"
+        await updater.add_artifact([TextPart(text=response_text)])
+        await updater.update_status(TaskState.completed, final=True)
 
-        response_parts = [TextPart(text=response_text)]
-        await updater.add_artifact(response_parts)
+    async def _execute_llm(self, updater, context, text: str):
+        """Answers free-form messages with the ADK Runner (through the cache and budgets), if enabled."""
+        if not LLM_ENABLED:
+            response_text = (f"I received your message: {text}. I am an Apply Agent. "
+                             f"Try e.g. \"Apply for job ID <id> using my_resume.txt\" or "
+                             f"\"Rank top 10 jobs for resume my_resume.txt\".")
+            await updater.add_artifact([TextPart(text=response_text)])
+            await updater.update_status(TaskState.completed, final=True)
+            return
+        try:
+            # Follow-ups in an existing task depend on the conversation, so they bypass the cache
+            reply = await self._llm.ask(text, session_id=context.context_id, cacheable=context.current_task is None)
+        except BudgetExceeded as e:
+            await updater.add_artifact([TextPart(text=str(e))])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        except Exception as e:
+            await updater.add_artifact([TextPart(text=f"Error running the Apply Agent model: {e}")])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        await updater.add_artifact([TextPart(text=reply.text or "(no answer)")], metadata={"cached": reply.cached})
+        await updater.update_status(TaskState.completed, final=True)
+
+    async def _execute_rank(self, updater, resume_filename: str, top_k: int):
+        """Ranks stored jobs against the resume and returns the top matches."""
+        import asyncio
+        from .ranking import rank_jobs
+        try:
+            # Matrix work runs off the event loop
+            matches = await asyncio.to_thread(rank_jobs, resume_filename, top_k)
+        except FileNotFoundError:
+            await updater.add_artifact([TextPart(text=f"Resume file {resume_filename} not found.")])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        lines = [f"{i}. {m['title']} ({m['id']}, score {m['score']})" for i, m in enumerate(matches, 1)]
+        summary = f"Top {len(matches)} jobs for {resume_filename}:\n" + "\n".join(lines)
+        await updater.add_artifact([TextPart(text=summary), DataPart(data={"matches": matches})])
+        await updater.update_status(TaskState.completed, final=True)
+
+    async def _execute_bulk(self, updater, job_ids: list, resume_filename: str):
+        """Applies for every job in one task, reporting progress as status updates."""
+        from .apply_tools import iter_bulk_apply
+        total = len(set(job_ids))
+        results = {}
+        try:
+            async for job_id, result in iter_bulk_apply(job_ids, resume_filename):
+                results[job_id] = result
+                progress = {"job_id": job_id, "result": result, "done": len(results), "total": total}
+                await updater.update_status(
+                    TaskState.working,
+                    message=updater.new_agent_message(
+                        [TextPart(text=f"[{len(results)}/{total}] {result}"), DataPart(data=progress)]
+                    ),
+                )
+        except FileNotFoundError as e:
+            await updater.add_artifact([TextPart(text=str(e))])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        await updater.add_artifact([
+            TextPart(text=f"Bulk application processed for {len(results)} jobs using {resume_filename}."),
+            DataPart(data={"results": results}),
+        ])
         await updater.update_status(TaskState.completed, final=True)
 
     async def cancel(self, context, event_queue):
         pass
 
-from .agent import create_apply_agent
+from search_agent.task_store import create_runner_services, create_task_store
 
 DEFAULT_HOST = '127.0.0.1'
 DEFAULT_PORT = 10002 # Apply Agent on 10002
+# Server processes; 0 = one per CPU core
+APPLY_WORKERS = int(os.environ.get('APPLY_WORKERS', '1'))
 
-def main():
-    agent = create_apply_agent()
-    
+def build_runner(app_name: str):
+    # google.adk and google.genai take seconds to import, so they load only when the LLM path runs
+    from google.adk import Runner
+    from .agent import create_apply_agent
+
+    return Runner(app_name=app_name, agent=create_apply_agent(), auto_create_session=True,
+                  **create_runner_services('apply'))
+
+def build_app():
     # Use localhost for the public URL, but bind to 0.0.0.0
     app_url = os.environ.get('APPLY_AGENT_URL', f'http://localhost:{DEFAULT_PORT}')
     
@@ -79,7 +188,15 @@ def main():
         name='Apply Job',
         description='Applies for a job given an ID and resume',
         tags=['apply', 'jobs'],
-        examples=['Apply for job google_0 with my_resume.txt'],
+        examples=['Apply for job google_0 with my_resume.txt', 'Apply for job IDs google_0, google_1 using my_resume.txt'],
+    )
+    
+    rank_skill = AgentSkill(
+        id='rank_jobs_skill',
+        name='Rank Jobs',
+        description='Ranks stored jobs by relevance to a resume and returns the top matches',
+        tags=['rank', 'match', 'jobs', 'resume'],
+        examples=['Rank top 10 jobs for resume my_resume.txt'],
     )
     
     agent_card = AgentCard(
@@ -90,23 +207,32 @@ def main():
         default_input_modes=['text'],
         default_output_modes=['text'],
         capabilities=capabilities,
-        skills=[skill],
+        skills=[skill, rank_skill],
     )
     
-    runner = Runner(
-        app_name=agent_card.name,
-        agent=agent,
-        artifact_service=InMemoryArtifactService(),
-        session_service=InMemorySessionService(),
-        memory_service=InMemoryMemoryService(),
-    )
+    executor = ApplyAgentExecutor(lambda: build_runner(agent_card.name), agent_card)
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=create_task_store('apply'))
     
-    executor = ApplyAgentExecutor(runner, agent_card)
-    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
-    
-    app = A2AStarletteApplication(agent_card=agent_card, http_handler=handler)
-    
-    uvicorn.run(app.build(), host=DEFAULT_HOST, port=DEFAULT_PORT)
+    app = A2AStarletteApplication(agent_card=agent_card, http_handler=handler).build()
+    app.add_middleware(MetricsMiddleware, name="apply_agent")
+    app.add_route("/metrics", metrics_endpoint)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply Agent A2A server')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Report import and app build times instead of serving')
+    parser.add_argument('--workers', type=int, default=APPLY_WORKERS,
+                        help='Worker processes (0 = one per CPU core)')
+    args = parser.parse_args()
+    if args.profile_startup:
+        from search_agent.startup import profile_startup
+        profile_startup('apply_agent.__main__')
+        return
+
+    from search_agent.startup import run_server
+    run_server('apply_agent.__main__:build_app', DEFAULT_HOST, DEFAULT_PORT, args.workers,
+               factory=True, app=build_app)
 
 if __name__ == '__main__':
     main()
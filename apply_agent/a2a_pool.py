@@ -0,0 +1,103 @@
+import asyncio
+import os
+import time
+
+import httpx
+from a2a.client import A2ACardResolver, A2AClient, ClientCallContext, ClientConfig, ClientFactory
+
+from search_agent.telemetry import counter, stage, trace_headers
+
+try:
+    import h2  # noqa: F401  (optional, enables HTTP/2 on the pooled client)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+CARD_TTL = float(os.environ.get('A2A_CARD_TTL', '300'))
+
+card_lookups = counter("a2a_card_cache_total", "Agent card lookups by cache result.", ("result",))
+
+
+def call_context():
+    """Client call context forwarding the active trace to the remote agent, or None when not tracing."""
+    headers = trace_headers()
+    return ClientCallContext(state={"http_kwargs": {"headers": headers}}) if headers else None
+
+
+class A2AClientPool:
+    """Long-lived httpx client plus cached agent cards and A2A clients.
+
+    Card resolution and client construction happen once per agent URL and are
+    refreshed after `card_ttl` seconds or after `invalidate(url)` (e.g. when a
+    call fails), instead of on every request.
+    """
+
+    def __init__(self, card_ttl: float = CARD_TTL, timeout: float = 30.0,
+                 max_connections: int = 100, max_keepalive_connections: int = 20):
+        self.card_ttl = card_ttl
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=60,
+        )
+        self._http = None
+        self._entries = {}  # url -> {"expires": float, "card": AgentCard, "client": ..., "legacy": ...}
+        self._locks = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=HTTP2_AVAILABLE)
+        return self._http
+
+    async def start(self):
+        """Opens the pooled HTTP client (optional; it is also created on first use)."""
+        _ = self.http
+
+    async def aclose(self):
+        self._entries.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def invalidate(self, url: str):
+        """Drops the cached card and clients for `url` so the next call re-resolves them."""
+        self._entries.pop(url, None)
+
+    async def _entry(self, url: str) -> dict:
+        entry = self._entries.get(url)
+        if entry is not None and entry["expires"] > time.monotonic():
+            card_lookups.inc("hit")
+            return entry
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            # Another request may have refreshed the entry while we waited
+            entry = self._entries.get(url)
+            if entry is not None and entry["expires"] > time.monotonic():
+                card_lookups.inc("hit")
+                return entry
+            card_lookups.inc("miss")
+            with stage("a2a.card_resolve", url=url):
+                card = await A2ACardResolver(self.http, url).get_agent_card()
+            entry = {"expires": time.monotonic() + self.card_ttl, "card": card, "client": None, "legacy": None}
+            self._entries[url] = entry
+            return entry
+
+    async def get_card(self, url: str):
+        return (await self._entry(url))["card"]
+
+    async def get_client(self, url: str):
+        """Returns a cached `a2a.client.Client` for the agent at `url`."""
+        entry = await self._entry(url)
+        if entry["client"] is None:
+            factory = ClientFactory(ClientConfig(httpx_client=self.http))
+            entry["client"] = factory.create(entry["card"])
+        return entry["client"]
+
+    async def get_legacy_client(self, url: str) -> A2AClient:
+        """Returns a cached JSON-RPC `A2AClient` for the agent at `url`."""
+        entry = await self._entry(url)
+        if entry["legacy"] is None:
+            entry["legacy"] = A2AClient(self.http, entry["card"], url=url)
+        return entry["legacy"]
@@ -1,11 +1,12 @@
 from google.adk import Agent
-from .apply_tools import get_job_details_from_search_agent, read_resume, apply_for_job
+from search_agent.llm import create_model, generate_config
+from .apply_tools import get_job_details_from_search_agent, read_resume, apply_for_job, apply_for_jobs_bulk, rank_jobs_for_resume
 
 def create_apply_agent() -> Agent:
     """Creates the Apply Agent instance."""
     
     agent = Agent(
-        model='gemini-2.5-flash-lite',
+        model=create_model(),
         name='Apply_Agent',
         instruction="""
         You are an Apply Agent. Your goal is to apply for jobs.
@@ -15,9 +16,13 @@ def create_apply_agent() -> Agent:
         1. If you have a Job ID, first verify it and get details using `get_job_details_from_search_agent`.
         2. Read the specified resume using `read_resume`.
         3. Once you have the details and the resume, use `apply_for_job`.
+
+        To apply for many jobs with the same resume, use `apply_for_jobs_bulk` with the list of Job IDs.
+        To find which stored jobs best match a resume, use `rank_jobs_for_resume`.
         
         If you are missing information (like resume filename), ask the user.
         """,
-        tools=[get_job_details_from_search_agent, read_resume, apply_for_job],
+        generate_content_config=generate_config(),
+        tools=[get_job_details_from_search_agent, read_resume, apply_for_job, apply_for_jobs_bulk, rank_jobs_for_resume],
     )
     return agent
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from search_agent.job_store import DATA_DIR
+
+APPLICATIONS_DB_PATH = os.environ.get('APPLICATIONS_DB_PATH', os.path.join(DATA_DIR, 'applications.db'))
+# Most applications committed together; everything queued while a commit runs joins the next one
+APPLY_COMMIT_BATCH = int(os.environ.get('APPLY_COMMIT_BATCH', '256'))
+
+RESUMES_DIR = os.path.join(DATA_DIR, 'resumes')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    resume_hash TEXT NOT NULL REFERENCES resumes(hash),
+    company TEXT,
+    title TEXT,
+    url TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (job_id, resume_hash)
+);
+-- Lookups by job use the UNIQUE index, which starts with job_id
+CREATE INDEX IF NOT EXISTS idx_applications_company ON applications(company);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+_COLUMNS = ("job_id", "resume_hash", "company", "title", "url", "status", "created_at")
+
+
+def resume_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def job_summary(job_details: str) -> dict:
+    """Returns the `company`, `title` and `url` of a job details JSON string (all None if it isn't one)."""
+    try:
+        job = json.loads(job_details)
+    except (TypeError, ValueError):
+        job = None
+    if not isinstance(job, dict):
+        job = {}
+    return {"company": job.get("company"), "title": job.get("title"), "url": job.get("url")}
+
+
+class ApplicationStore:
+    """Append-only SQLite log of job applications.
+
+    Each application is a compact row pointing at its resume by SHA-256;
+    a resume's text is stored once however many applications use it. A
+    job can be applied for once per resume: recording the same (job,
+    resume) pair again returns the original application.
+
+    Writes go through one writer thread that commits everything queued in
+    a single transaction, so concurrent applications (a bulk apply) share
+    one fsync instead of paying for one each. Commits use
+    `synchronous=FULL`: an application reported as recorded survives a
+    power loss.
+    """
+
+    def __init__(self, db_path: str = APPLICATIONS_DB_PATH, batch_size: int = APPLY_COMMIT_BATCH):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, job_id: str, resume_content: str, job_details: str = None,
+               status: str = "submitted", created_at: float = None) -> tuple:
+        """Records an application, unless this job was already applied for with this resume.
+
+        Blocks until the application is committed.
+
+        Args:
+            job_id: The job applied for.
+            resume_content: Full text of the resume used.
+            job_details: The job's details as a JSON string, for its company, title and URL.
+            status: Application status.
+            created_at: UNIX time of the application (defaults to now).
+
+        Returns:
+            An `(application, created)` tuple; `created` is False when an
+            earlier application for the same job and resume was returned.
+        """
+        item = {
+            "job_id": job_id, "resume_hash": resume_hash(resume_content), "resume": resume_content,
+            "status": status, "created_at": created_at or time.time(), **job_summary(job_details),
+        }
+        future = Future()
+        self._queue.put((item, future))
+        self._ensure_writer()
+        return future.result()
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="application_writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self._write_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _write_batch(self, items: list) -> list:
+        conn = self._conn()
+        results = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO resumes (hash, content, created_at) VALUES (?, ?, ?)",
+                [(item["resume_hash"], item["resume"], item["created_at"]) for item in items],
+            )
+            for item in items:
+                # The write lock is held, so no other process can insert between the check and the insert
+                row = conn.execute(
+                    "SELECT * FROM applications WHERE job_id = ? AND resume_hash = ?",
+                    (item["job_id"], item["resume_hash"]),
+                ).fetchone()
+                if row is not None:
+                    results.append((dict(row), False))
+                    continue
+                cursor = conn.execute(
+                    """
+                    INSERT INTO applications (job_id, resume_hash, company, title, url, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (item["job_id"], item["resume_hash"], item["company"], item["title"], item["url"],
+                     item["status"], item["created_at"]),
+                )
+                results.append(({"id": cursor.lastrowid, **{k: item[k] for k in _COLUMNS}}, True))
+        return results
+
+    def get(self, job_id: str, resume_content: str):
+        """Returns the application for this job and resume, or None."""
+        row = self._conn().execute(
+            "SELECT * FROM applications WHERE job_id = ? AND resume_hash = ?", (job_id, resume_hash(resume_content))
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_resume(self, content_hash: str):
+        """Returns the resume text stored under `content_hash`, or None."""
+        row = self._conn().execute("SELECT content FROM resumes WHERE hash = ?", (content_hash,)).fetchone()
+        return row[0] if row else None
+
+    def list_page(self, job_id: str = None, company: str = None, status: str = None,
+                  after: int = None, limit: int = 100) -> tuple:
+        """Returns one page of applications, oldest first.
+
+        Args:
+            job_id: Only applications for this job.
+            company: Only applications for this company.
+            status: Only applications with this status.
+            after: Pagination cursor returned by a previous page.
+            limit: Maximum number of applications to return.
+
+        Returns:
+            A `(applications, next_cursor)` tuple; `next_cursor` is None on the last page.
+        """
+        clauses, params = [], []
+        for column, value in (("job_id", job_id), ("company", company), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if after is not None:
+            clauses.append("id > ?")
+            params.append(after)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT * FROM applications{where} ORDER BY id LIMIT ?", (*params, limit + 1)
+        ).fetchall()
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return [dict(row) for row in rows[:limit]], next_cursor
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+    def import_legacy_files(self, resumes_dir: str = RESUMES_DIR, force: bool = False) -> int:
+        """One-shot import of `application_<job_id>.txt` files written by older versions.
+
+        The files are left in place; the import is recorded in the `meta`
+        table so it only runs once unless `force` is set.
+
+        Args:
+            resumes_dir: Directory holding the legacy application files.
+            force: Re-import even if an import has already been recorded.
+
+        Returns:
+            The number of files imported.
+        """
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = 'legacy_import_done'").fetchone()
+        if done and not force:
+            return 0
+        imported = 0
+        if os.path.isdir(resumes_dir):
+            for name in sorted(os.listdir(resumes_dir)):
+                if not (name.startswith("application_") and name.endswith(".txt")):
+                    continue
+                path = os.path.join(resumes_dir, name)
+                try:
+                    with open(path, "r") as f:
+                        text = f.read()
+                except OSError:
+                    continue
+                # Layout: "Application for Job <id>\nDetails: <details>\nResume: <resume text>\n"
+                head, sep, resume = text.partition("\nResume: ")
+                details = head.partition("\nDetails: ")[2]
+                if not sep:
+                    continue
+                job_id = name[len("application_"):-len(".txt")]
+                self.record(job_id, resume[:-1] if resume.endswith("\n") else resume, details,
+                            created_at=os.path.getmtime(path))
+                imported += 1
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_import_done', ?)", (str(time.time()),)
+            )
+        return imported
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_application_store() -> ApplicationStore:
+    """Returns the process-wide ApplicationStore, importing legacy application files on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = ApplicationStore()
+                imported = store.import_legacy_files()
+                if imported:
+                    print(f"Imported {imported} legacy application files into {store.db_path}.")
+                _store = store
+    return _store
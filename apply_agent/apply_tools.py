@@ -1,17 +1,103 @@
 import os
+import contextvars
 import json
 import httpx
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import asyncio # needed if we were running async in tools, but standard tools are sync or async. 
 # ADK tools can be async.
 
-from a2a.client import A2ACardResolver, A2AClient
 from a2a.types import SendMessageRequest, MessageSendParams, SendMessageSuccessResponse, Task
+from search_agent.job_store import DATA_DIR, get_store
+from search_agent.telemetry import counter, stage, trace_headers
+from .a2a_pool import A2AClientPool
+from .application_store import get_application_store
 
 SEARCH_AGENT_URL = os.environ.get('SEARCH_AGENT_URL', 'http://localhost:10001')
-RESUMES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'resumes')
+RESUMES_DIR = os.path.join(DATA_DIR, 'resumes')
 os.makedirs(RESUMES_DIR, exist_ok=True)
 
+# Shared across tool calls so the Search Agent card and connections are reused
+search_agent_pool = A2AClientPool()
+
+# Bulk apply: job details are fetched this many at a time, applications run on a bounded pool
+APPLY_DETAILS_BATCH_SIZE = int(os.environ.get('APPLY_DETAILS_BATCH_SIZE', '20'))
+APPLY_MAX_CONCURRENCY = int(os.environ.get('APPLY_MAX_CONCURRENCY', '8'))
+_apply_pool = ThreadPoolExecutor(max_workers=APPLY_MAX_CONCURRENCY, thread_name_prefix='apply_worker')
+
+JOB_DETAILS_CACHE_SIZE = int(os.environ.get('JOB_DETAILS_CACHE_SIZE', '2048'))
+
+details_lookups = counter("job_details_cache_total", "Job details lookups by cache result.", ("result",))
+
+
+class JobDetailsCache:
+    """LRU cache of job details fetched from the Search Agent.
+
+    Entries are invalidated when the Search Agent re-scrapes a job: the cache
+    tails the job store's change events (at most once per `sync_interval`) and
+    drops every job that was updated or had its page fetched. If events were
+    pruned before we saw them, the whole cache is cleared.
+    """
+
+    def __init__(self, maxsize: int = JOB_DETAILS_CACHE_SIZE, sync_interval: float = 1.0):
+        self.maxsize = maxsize
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._last_seq = None
+        self._last_sync = 0.0
+
+    def _sync(self):
+        now = time.monotonic()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        store = get_store()
+        if self._last_seq is None:
+            self._last_seq = store.last_event_seq()
+            return
+        while True:
+            events = store.events_after(self._last_seq)
+            if not events:
+                return
+            if events[0][0] > self._last_seq + 1:
+                self._entries.clear()
+            for seq, event_type, payload in events:
+                if event_type == "job":
+                    self._entries.pop(json.loads(payload)["job"]["id"], None)
+                elif event_type == "job_page":
+                    # Details include the fetched page, so a new page invalidates them too
+                    self._entries.pop(json.loads(payload)["job_id"], None)
+                self._last_seq = seq
+
+    def get_many(self, job_ids: list) -> dict:
+        self._sync()
+        found = {}
+        for job_id in job_ids:
+            job = self._entries.get(job_id)
+            if job is None:
+                self.misses += 1
+                details_lookups.inc("miss")
+                continue
+            self.hits += 1
+            details_lookups.inc("hit")
+            self._entries.move_to_end(job_id)
+            found[job_id] = job
+        return found
+
+    def put_many(self, jobs: dict):
+        for job_id, job in jobs.items():
+            self._entries[job_id] = job
+            self._entries.move_to_end(job_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+job_details_cache = JobDetailsCache()
+
 async def get_job_details_from_search_agent(job_id: str) -> str:
     """Retrieves job details from the Search Agent using A2A.
 
@@ -19,44 +105,67 @@ async def get_job_details_from_search_agent(job_id: str) -> str:
         job_id: The ID of the job to retrieve.
 
     Returns:
-        The job details or an error message.
+        The job details as a JSON string, or an error message.
     """
-    print(f"Connecting to Search Agent at {SEARCH_AGENT_URL} for job {job_id}...")
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resolver = A2ACardResolver(client, SEARCH_AGENT_URL)
-            card = await resolver.get_agent_card()
-            
-            agent_client = A2AClient(client, card, url=SEARCH_AGENT_URL)
-            
-            message_id = uuid.uuid4().hex
-            payload = {
-                'message': {
-                    'role': 'user',
-                    'parts': [{'type': 'text', 'text': f'Get details for job ID: {job_id}'}],
-                    'messageId': message_id,
-                }
-            }
-            
-            request = SendMessageRequest(id=message_id, params=MessageSendParams.model_validate(payload))
-            response = await agent_client.send_message(request)
-            
-            if isinstance(response.root, SendMessageSuccessResponse):
-                 result = response.root.result
-                 # Result is a Task object. We need to extract the "output" or last message.
-                 # The 'Task' object in a2a-sdk might have changed or I need to check its structure.
-                 # Based on 'host_agent_executor.py', the response is a list of parts in the task update.
-                 # But 'send_message' returns a 'Task' object which represents the task state.
-                 # We usually look at 'task.status' and 'task.artifacts' or messages.
-                 
-                 # Let's simple return the whole task rep for now or try to find the text.
-                 # If the task is completed, we should find the answer.
-                 return str(result) 
-            else:
-                return f"Error from Search Agent: {response}"
-                
+        jobs = await get_jobs_details_from_search_agent([job_id])
     except Exception as e:
         return f"Failed to communicate with Search Agent: {e}"
+    if job_id in jobs:
+        return json.dumps(jobs[job_id], indent=2)
+    return f"Job with ID {job_id} not found."
+
+async def get_jobs_details_from_search_agent(job_ids: list) -> dict:
+    """Retrieves details for many jobs, asking the Search Agent once for all cache misses.
+
+    Args:
+        job_ids: The IDs of the jobs to retrieve.
+
+    Returns:
+        A `{job_id: job}` dict; IDs the Search Agent does not know are left out.
+
+    Raises:
+        RuntimeError: If the Search Agent returns an error or no structured result.
+    """
+    jobs = job_details_cache.get_many(job_ids)
+    missing = [j for j in dict.fromkeys(job_ids) if j not in jobs]
+    if not missing:
+        return jobs
+
+    print(f"Connecting to Search Agent at {SEARCH_AGENT_URL} for {len(missing)} job(s)...")
+    try:
+        agent_client = await search_agent_pool.get_legacy_client(SEARCH_AGENT_URL)
+
+        message_id = uuid.uuid4().hex
+        payload = {
+            'message': {
+                'role': 'user',
+                'parts': [{'kind': 'text', 'text': f"Get details for job IDs: {', '.join(missing)}"}],
+                'messageId': message_id,
+            }
+        }
+
+        request = SendMessageRequest(id=message_id, params=MessageSendParams.model_validate(payload))
+        with stage("apply.a2a.job_details", jobs=len(missing)):
+            response = await agent_client.send_message(request, http_kwargs={"headers": trace_headers()})
+    except Exception:
+        search_agent_pool.invalidate(SEARCH_AGENT_URL)
+        raise
+
+    if not isinstance(response.root, SendMessageSuccessResponse):
+        raise RuntimeError(f"Error from Search Agent: {response}")
+    result = response.root.result
+    # The Search Agent answers with a DataPart {"jobs": {...}, "missing": [...]} artifact
+    fetched = None
+    for artifact in getattr(result, 'artifacts', None) or []:
+        for part in artifact.parts:
+            if getattr(part.root, 'kind', None) == 'data' and 'jobs' in part.root.data:
+                fetched = part.root.data['jobs']
+    if fetched is None:
+        raise RuntimeError(f"Search Agent returned no job details: {result}")
+    job_details_cache.put_many(fetched)
+    jobs.update(fetched)
+    return jobs
 
 def read_resume(resume_filename: str) -> str:
     """Reads a resume file from the local resumes directory.
@@ -73,6 +182,22 @@ def read_resume(resume_filename: str) -> str:
             return f.read()
     return f"Resume file {resume_filename} not found."
 
+def rank_jobs_for_resume(resume_filename: str, top_k: int = 10) -> str:
+    """Ranks the stored jobs by relevance to a resume.
+
+    Args:
+        resume_filename: The name of the resume file.
+        top_k: How many of the best-matching jobs to return.
+
+    Returns:
+        A JSON string with the top jobs and their relevance scores, best first.
+    """
+    from .ranking import rank_jobs
+    try:
+        return json.dumps(rank_jobs(resume_filename, top_k=top_k), indent=2)
+    except FileNotFoundError:
+        return f"Resume file {resume_filename} not found."
+
 def apply_for_job(job_id: str, job_details: str, resume_content: str) -> str:
     """Simulates applying for a job.
 
@@ -86,10 +211,86 @@ def apply_for_job(job_id: str, job_details: str, resume_content: str) -> str:
     """
     print(f"Applying for job {job_id}...")
     # Mock application logic
-    application_file = os.path.join(RESUMES_DIR, f"application_{job_id}.txt")
-    with open(application_file, "w") as f:
-        f.write(f"Application for Job {job_id}\n")
-        f.write(f"Details: {job_details}\n")
-        f.write(f"Resume: {resume_content}\n")
-        
-    return f"Successfully applied for Job {job_id}. Application saved to {application_file}."
+    with stage("apply.write_application", job_id=job_id):
+        # Concurrent applications are committed together by the store's writer
+        application, created = get_application_store().record(job_id, resume_content, job_details)
+        if not created:
+            return f"Already applied for Job {job_id} with this resume (application {application['id']})."
+
+        # Notify live dashboards through the bridge's event feed
+        get_store().add_event("application", {"job_id": job_id, "status": application["status"],
+                                              "application_id": application["id"]})
+
+    return f"Successfully applied for Job {job_id}. Application {application['id']} recorded."
+
+async def iter_bulk_apply(job_ids: list, resume_filename: str):
+    """Applies for many jobs with one resume, yielding each result as it finishes.
+
+    The resume is read once. Job details are fetched APPLY_DETAILS_BATCH_SIZE
+    at a time in one Search Agent request per batch; applications for a batch run on the bounded worker pool while
+    the next batch of details is being fetched.
+
+    Args:
+        job_ids: The job IDs to apply for; duplicates are applied for once.
+        resume_filename: The name of the resume file in the resumes directory.
+
+    Yields:
+        `(job_id, result)` tuples in completion order. Jobs whose details
+        cannot be fetched are reported as failed and not applied for.
+
+    Raises:
+        FileNotFoundError: If the resume does not exist.
+    """
+    resume_path = os.path.join(RESUMES_DIR, resume_filename)
+    if not os.path.exists(resume_path):
+        raise FileNotFoundError(f"Resume file {resume_filename} not found.")
+    resume_content = read_resume(resume_filename)
+    loop = asyncio.get_running_loop()
+
+    async def apply_one(job_id, job_details):
+        try:
+            call = contextvars.copy_context().run
+            result = await loop.run_in_executor(_apply_pool, call, apply_for_job, job_id, job_details, resume_content)
+        except Exception as e:
+            result = f"Failed to apply for Job {job_id}: {e}"
+        return job_id, result
+
+    ids = list(dict.fromkeys(job_ids))
+    pending = set()
+    for start in range(0, len(ids), APPLY_DETAILS_BATCH_SIZE):
+        batch = ids[start:start + APPLY_DETAILS_BATCH_SIZE]
+        try:
+            jobs = await get_jobs_details_from_search_agent(batch)
+        except Exception as e:
+            # Nothing is applied for without its details
+            for job_id in batch:
+                yield job_id, f"Failed to apply for Job {job_id}: failed to communicate with Search Agent: {e}"
+            continue
+        for job_id in batch:
+            if job_id not in jobs:
+                yield job_id, f"Failed to apply for Job {job_id}: job with ID {job_id} not found."
+        pending.update(asyncio.ensure_future(apply_one(j, json.dumps(jobs[j]))) for j in batch if j in jobs)
+        done = {task for task in pending if task.done()}
+        pending -= done
+        for task in done:
+            yield task.result()
+    for next_done in asyncio.as_completed(pending):
+        yield await next_done
+
+async def apply_for_jobs_bulk(job_ids: list[str], resume_filename: str) -> str:
+    """Applies for several jobs at once using the same resume.
+
+    Args:
+        job_ids: The job IDs to apply for.
+        resume_filename: The name of the resume file.
+
+    Returns:
+        A JSON string mapping each job ID to its application status.
+    """
+    results = {}
+    try:
+        async for job_id, result in iter_bulk_apply(job_ids, resume_filename):
+            results[job_id] = result
+    except FileNotFoundError as e:
+        return str(e)
+    return json.dumps(results, indent=2)
@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+from search_agent.job_identity import normalize_company
+from search_agent.job_store import DATA_DIR, get_store
+
+RESUMES_DIR = os.path.join(DATA_DIR, 'resumes')
+
+# Hashed feature space; collisions are rare enough at this size for ranking
+N_FEATURES = 2 ** 18
+# Compact the matrix once this fraction of rows belongs to replaced jobs
+COMPACT_RATIO = 0.3
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def hashed_tf(text: str) -> dict:
+    """Returns `{feature_index: sublinear_tf}` for `text` (unigrams and bigrams)."""
+    tokens = tokenize(text)
+    counts = {}
+    for term in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        # crc32 is stable across processes, unlike hash()
+        index = zlib.crc32(term.encode("utf-8")) % N_FEATURES
+        counts[index] = counts.get(index, 0) + 1
+    return {index: 1.0 + math.log(count) for index, count in counts.items()}
+
+
+def job_text(job: dict) -> str:
+    # Title and company words count double: they are the strongest signal in short snippets
+    title = f"{job.get('title') or ''} {job.get('company') or ''}"
+    # The fetched posting text, when there is one, is a superset of the search snippet
+    return f"{title} {title} {job.get('page_text') or job.get('description') or ''}"
+
+
+class JobRanker:
+    """TF-IDF ranking of stored jobs against a resume with one sparse matrix product.
+
+    Job term frequencies live in a CSR matrix that is built once from the job
+    store and then updated incrementally from the store's change events. A
+    re-scraped job gets a new row and its old row is masked until the matrix
+    is compacted; a closed job's row is masked the same way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_cache = {}
+        self._reset()
+
+    def _reset(self):
+        self._matrix = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self._ids = []
+        self._companies = []
+        self._live = np.zeros(0, dtype=bool)
+        self._row_of = {}
+        self._df = np.zeros(N_FEATURES, dtype=np.float32)
+        self._last_seq = None
+
+    def _append(self, jobs: list):
+        if not jobs:
+            return
+        rows, cols, vals = [], [], []
+        for offset, job in enumerate(jobs):
+            for index, value in hashed_tf(job_text(job)).items():
+                rows.append(offset)
+                cols.append(index)
+                vals.append(value)
+        block = sparse.csr_matrix((vals, (rows, cols)), shape=(len(jobs), N_FEATURES), dtype=np.float32)
+        start = len(self._ids)
+        for offset, job in enumerate(jobs):
+            old_row = self._row_of.get(job["id"])
+            if old_row is not None:
+                self._kill(old_row)
+            self._row_of[job["id"]] = start + offset
+            self._ids.append(job["id"])
+            self._companies.append(normalize_company(job.get("company")))
+        self._matrix = sparse.vstack([self._matrix, block], format="csr")
+        self._live = np.concatenate([self._live, np.ones(len(jobs), dtype=bool)])
+        np.add.at(self._df, block.indices, 1)
+
+    def _kill(self, row: int):
+        self._live[row] = False
+        start, end = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+        np.subtract.at(self._df, self._matrix.indices[start:end], 1)
+
+    def _close(self, job_id: str):
+        row = self._row_of.pop(job_id, None)
+        if row is not None and self._live[row]:
+            self._kill(row)
+
+    def _compact(self):
+        keep = np.flatnonzero(self._live)
+        self._matrix = self._matrix[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._companies = [self._companies[i] for i in keep]
+        self._live = np.ones(len(self._ids), dtype=bool)
+        self._row_of = {job_id: row for row, job_id in enumerate(self._ids)}
+
+    @staticmethod
+    def _with_pages(store, jobs: list) -> list:
+        """Adds the fetched posting text to the jobs that have one, as `page_text`."""
+        by_id = {job["id"]: job for job in jobs}
+        for job_id, page in store.get_pages(list(by_id)).items():
+            if page["text"]:
+                by_id[job_id]["page_text"] = page["text"]
+        return jobs
+
+    def _rebuild(self, store):
+        self._reset()
+        self._last_seq = store.last_event_seq()
+        cursor = None
+        while True:
+            jobs, cursor = store.list_page(after=cursor, limit=5000, status="open")
+            self._append(self._with_pages(store, jobs))
+            if cursor is None:
+                break
+
+    def refresh(self):
+        """Brings the matrix up to date with jobs stored since the last call."""
+        store = get_store()
+        with self._lock:
+            if self._last_seq is None:
+                self._rebuild(store)
+                return
+            while True:
+                events = store.events_after(self._last_seq)
+                if not events:
+                    break
+                if events[0][0] > self._last_seq + 1:
+                    # Events were pruned before we saw them
+                    self._rebuild(store)
+                    return
+                changed, fetched = {}, []
+                for seq, event_type, payload in events:
+                    if event_type == "job":
+                        event = json.loads(payload)
+                        job = event["job"]
+                        if event.get("action") == "closed":
+                            changed.pop(job["id"], None)
+                            self._close(job["id"])
+                        else:
+                            changed[job["id"]] = job
+                    elif event_type == "job_page":
+                        fetched.append(json.loads(payload)["job_id"])
+                    self._last_seq = seq
+                # A fetched page re-indexes its job with the fuller text, unless the job is closed
+                fetched = [j for j in fetched if j not in changed and j in self._row_of]
+                changed.update(store.get_jobs(fetched))
+                self._append(self._with_pages(store, list(changed.values())))
+            if len(self._ids) and 1 - self._live.mean() > COMPACT_RATIO:
+                self._compact()
+
+    def _resume_vector(self, resume_filename: str):
+        path = os.path.join(RESUMES_DIR, resume_filename)
+        mtime = os.path.getmtime(path)
+        cached = self._resume_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r") as f:
+                tf = hashed_tf(f.read())
+            vector = np.zeros(N_FEATURES, dtype=np.float32)
+            vector[list(tf.keys())] = list(tf.values())
+            cached = self._resume_cache[path] = (mtime, vector)
+        return cached[1]
+
+    def rank(self, resume_filename: str, top_k: int = 10, company: str = None) -> list:
+        """Returns the `top_k` stored jobs most similar to the resume.
+
+        Args:
+            resume_filename: Resume file name in the resumes directory.
+            top_k: Number of matches to return.
+            company: Only rank jobs for this company, in any letter case.
+
+        Returns:
+            A list of `{"id", "score"}` dicts, best match first.
+
+        Raises:
+            FileNotFoundError: If the resume does not exist.
+        """
+        resume = self._resume_vector(resume_filename)
+        self.refresh()
+        with self._lock:
+            n_docs = int(self._live.sum())
+            if not n_docs:
+                return []
+            idf = (np.log((1 + n_docs) / (1 + self._df)) + 1).astype(np.float32)
+            query = resume * idf
+            query_norm = np.linalg.norm(query)
+            if not query_norm:
+                return []
+            # Cosine similarity of idf-weighted vectors: two sparse mat-vec products for all jobs
+            dots = self._matrix @ (query * idf)
+            norms = np.sqrt(self._matrix.multiply(self._matrix) @ (idf * idf))
+            scores = np.divide(dots, norms * query_norm, out=np.zeros_like(dots), where=norms > 0)
+            scores[~self._live] = -1.0
+            if company:
+                scores[np.array(self._companies, dtype=object) != normalize_company(company)] = -1.0
+            ids = self._ids
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"id": ids[i], "score": round(float(scores[i]), 4)} for i in top if scores[i] > 0]
+
+
+_ranker = None
+_ranker_lock = threading.Lock()
+
+
+def get_ranker() -> JobRanker:
+    global _ranker
+    if _ranker is None:
+        with _ranker_lock:
+            if _ranker is None:
+                _ranker = JobRanker()
+    return _ranker
+
+
+def rank_jobs(resume_filename: str, top_k: int = 10, company: str = None) -> list:
+    """Ranks stored jobs against a resume and returns the top matches with their details."""
+    matches = get_ranker().rank(resume_filename, top_k=top_k, company=company)
+    jobs = get_store().get_jobs([m["id"] for m in matches])
+    return [dict(jobs[m["id"]], score=m["score"]) for m in matches if m["id"] in jobs]
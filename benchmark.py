@@ -0,0 +1,246 @@
+"""Load/benchmark harness for the Search Agent, Apply Agent and bridge.
+
+Starts all three servers against the deterministic stub search backend and an
+isolated data directory, drives concurrent search/apply/list workloads through
+the bridge, and writes latency percentiles, throughput and memory to JSON.
+
+    python benchmark.py --requests 200 --concurrency 16 --output bench_results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BRIDGE_URL = "http://127.0.0.1:8000"
+SEARCH_AGENT_URL = "http://127.0.0.1:10001"
+APPLY_AGENT_URL = "http://127.0.0.1:10002"
+SERVERS = {
+    "search_agent": ([sys.executable, "-m", "search_agent"], f"{SEARCH_AGENT_URL}/.well-known/agent-card.json"),
+    "apply_agent": ([sys.executable, "-m", "apply_agent"], f"{APPLY_AGENT_URL}/.well-known/agent-card.json"),
+    "bridge": ([sys.executable, "bridge.py"], f"{BRIDGE_URL}/jobs?limit=1"),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", default="search,apply,list",
+                        help="Comma-separated workloads to run, in order (search, apply, list)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per workload")
+    parser.add_argument("--companies", type=int, default=20, help="Distinct companies cycled through by search")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Simulated upstream search latency (s)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the search result cache")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the temporary data directory")
+    return parser.parse_args()
+
+
+def rss_bytes(pid: int):
+    """Resident set size of a process (Linux /proc), or None where unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(sorted_values: list, pct: float):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, name: str, url: str, proc, start: float, timeout: float) -> float:
+    """Polls `url` until it answers 200 and returns the seconds since the process was started at `start`."""
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{name} exited during startup (code {proc.returncode})")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError(f"{name} not ready after {timeout:.0f}s")
+
+
+class MemorySampler:
+    def __init__(self, procs: dict, interval: float = 0.25):
+        self.procs = procs
+        self.interval = interval
+        self.peak = {name: 0 for name in procs}
+
+    async def run(self):
+        while True:
+            for name, proc in self.procs.items():
+                rss = rss_bytes(proc.pid)
+                if rss:
+                    self.peak[name] = max(self.peak[name], rss)
+            await asyncio.sleep(self.interval)
+
+
+def response_ok(resp: httpx.Response) -> bool:
+    """Whether a bridge response succeeded; streamed and JSON answers can report a failure with HTTP 200."""
+    if resp.status_code >= 400:
+        return False
+    content_type = resp.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/x-ndjson"):
+            # /search reports the outcome in its final line
+            lines = resp.text.strip().splitlines()
+            return bool(lines) and json.loads(lines[-1]).get("status") == "success"
+        if content_type.startswith("application/json"):
+            body = resp.json()
+            return not (isinstance(body, dict) and body.get("status") in ("error", "failed"))
+    except ValueError:
+        return False
+    return True
+
+
+async def run_workload(client: httpx.AsyncClient, name: str, make_request, total: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                resp = await make_request(client, i)
+                ok = response_ok(resp)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "workload": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(total / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            p: round(percentile(latencies, q) * 1000, 2) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))
+        } | {"max": round(latencies[-1] * 1000, 2) if latencies else None},
+    }
+
+
+def workloads(args, job_ids: list) -> dict:
+    async def search(client, i):
+        return await client.post(f"{BRIDGE_URL}/search", json={"company": f"BenchCo{i % args.companies}"})
+
+    async def apply(client, i):
+        job_id = job_ids[i % len(job_ids)] if job_ids else f"benchco0_{i}"
+        return await client.post(f"{BRIDGE_URL}/apply", json={"job_id": job_id, "resume_name": "my_resume.txt"})
+
+    async def list_jobs(client, i):
+        return await client.get(f"{BRIDGE_URL}/jobs", params={"limit": 100})
+
+    return {"search": search, "apply": apply, "list": list_jobs}
+
+
+async def main():
+    args = parse_args()
+    data_dir = tempfile.mkdtemp(prefix="searchjobs_bench_")
+    os.makedirs(os.path.join(data_dir, "resumes"))
+    shutil.copy(os.path.join(ROOT, "data", "resumes", "my_resume.txt"), os.path.join(data_dir, "resumes"))
+
+    env = os.environ.copy()
+    env.update({
+        "PYTHONPATH": ROOT,
+        "SEARCHJOBS_DATA_DIR": data_dir,
+        "SEARCH_BACKEND": "stub",
+        "SEARCH_STUB_LATENCY": str(args.stub_latency),
+        "SEARCH_RATE_LIMIT": "0",
+        # Stub job links point nowhere; page fetches would only add noise
+        "ENRICH_ENABLED": "0",
+    })
+    if args.no_cache:
+        env["SEARCH_CACHE_TTL"] = "0"
+
+    procs, logs, launched = {}, {}, {}
+    try:
+        for name, (cmd, _) in SERVERS.items():
+            logs[name] = open(os.path.join(data_dir, f"{name}.log"), "w")
+            launched[name] = time.perf_counter()
+            procs[name] = subprocess.Popen(cmd, env=env, cwd=ROOT, stdout=logs[name], stderr=subprocess.STDOUT)
+
+        limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+            startup = {}
+            for name, (_, ready_url) in SERVERS.items():
+                startup[name] = round(await wait_until_ready(client, name, ready_url, procs[name], launched[name], args.startup_timeout), 3)
+                print(f"{name} ready in {startup[name]}s")
+
+            sampler = MemorySampler(procs)
+            sampler_task = asyncio.create_task(sampler.run())
+            job_ids = []
+            runs = []
+            available = workloads(args, job_ids)
+            for name in [w.strip() for w in args.workloads.split(",") if w.strip()]:
+                if name not in available:
+                    raise SystemExit(f"Unknown workload {name!r}; choose from {', '.join(available)}")
+                if name == "apply" and not job_ids:
+                    job_ids.extend(j["id"] for j in (await client.get(f"{BRIDGE_URL}/jobs", params={"limit": 500, "fields": "id"})).json())
+                print(f"Running {name}: {args.requests} requests, concurrency {args.concurrency}...")
+                run = await run_workload(client, name, available[name], args.requests, args.concurrency)
+                print(f"  {run['rps']} req/s, p50 {run['latency_ms']['p50']} ms, p99 {run['latency_ms']['p99']} ms, errors {run['errors']}")
+                runs.append(run)
+            sampler_task.cancel()
+
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        except OSError:
+            commit = None
+        results = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": commit or None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+            "startup_s": startup,
+            "peak_rss_bytes": sampler.peak,
+            "workloads": runs,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    finally:
+        for proc in procs.values():
+            proc.terminate()
+        for proc in procs.values():
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        for log in logs.values():
+            log.close()
+        if args.keep_data:
+            print(f"Data and server logs kept in {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
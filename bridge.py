@@ -1,22 +1,91 @@
 import os
 import asyncio
+import hashlib
+import json
 import httpx
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
 from typing import List, Optional
 
 # A2A SDK imports
 try:
-    from a2a.client import ClientFactory
-    from a2a.types import SendMessageRequest, Message, TextPart, MessageSendParams, SendMessageSuccessResponse
+    from a2a.types import SendMessageRequest, Message, TaskState, TextPart, MessageSendParams, SendMessageSuccessResponse
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-    from a2a.client import ClientFactory
-    from a2a.types import SendMessageRequest, Message, TextPart, MessageSendParams, SendMessageSuccessResponse
+    from a2a.types import SendMessageRequest, Message, TaskState, TextPart, MessageSendParams, SendMessageSuccessResponse
 
-app = FastAPI()
+from apply_agent.a2a_pool import A2AClientPool, call_context
+from apply_agent.application_store import get_application_store
+from search_agent.job_record import dumps
+from search_agent.job_store import JOB_FIELDS, get_store
+from search_agent.recrawl import RECRAWL_INTERVAL, RECRAWL_MAX_INTERVAL, RECRAWL_MIN_INTERVAL
+from search_agent.telemetry import MetricsMiddleware, metrics_endpoint, stage
+
+class JobEventFeed:
+    """Tails the job store's event table once and fans events out to SSE subscribers.
+
+    The agents write events in their own processes; a single cheap indexed query
+    per poll interval serves every connected dashboard, however many there are.
+    """
+
+    def __init__(self, poll_interval: float = 0.5, queue_size: int = 1000):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.last_seq = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        store = get_store()
+        self.last_seq = await asyncio.to_thread(store.last_event_seq)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                events = await asyncio.to_thread(store.events_after, self.last_seq)
+            except Exception as e:
+                print(f"WEB BRIDGE WARNING: event feed poll failed: {e}")
+                continue
+            for event in events:
+                self.last_seq = event[0]
+                for queue in list(self.subscribers):
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        # Slow consumer: drop it; the browser reconnects with Last-Event-ID and replays
+                        self.subscribers.discard(queue)
+
+
+event_feed = JobEventFeed()
+
+
+a2a_pool = A2AClientPool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await a2a_pool.start()
+    feed_task = asyncio.create_task(event_feed.run())
+    try:
+        yield
+    finally:
+        feed_task.cancel()
+        await a2a_pool.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,64 +93,150 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor"],
 )
+# Per-route request counts and latencies; an incoming traceparent header continues the caller's trace
+app.add_middleware(MetricsMiddleware, name="bridge")
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 SEARCH_AGENT_URL = os.environ.get("SEARCH_AGENT_URL", "http://127.0.0.1:10001")
 APPLY_AGENT_URL = os.environ.get("APPLY_AGENT_URL", "http://127.0.0.1:10002")
+# Server processes for `python bridge.py`; 0 = one per CPU core
+BRIDGE_WORKERS = int(os.environ.get("BRIDGE_WORKERS", "1"))
 
 class SearchRequest(BaseModel):
     company: str
 
+class BatchSearchRequest(BaseModel):
+    companies: List[str]
+
 class ApplyRequest(BaseModel):
     job_id: str
     resume_name: str
 
+class BulkApplyRequest(BaseModel):
+    job_ids: List[str]
+    resume_name: str
+
+class WatchRequest(BaseModel):
+    company: str
+    interval: Optional[float] = None
+
 @app.post("/search")
 async def search_jobs(req: SearchRequest):
+    """Searches one company, streaming NDJSON: a `{"job": ...}` line per job as the Search Agent
+    stores it, then a final `{"status", "result"}` line with the summary (`status` is `success`
+    or `failed`, or `error` with an `error` message if the bridge lost the Search Agent)."""
     print(f"WEB BRIDGE: Searching for jobs at {req.company} via {SEARCH_AGENT_URL}...")
+    message = Message(
+        role="user",
+        parts=[TextPart(text=f"Find jobs at {req.company}")],
+        message_id="web_search_" + os.urandom(4).hex()
+    )
     try:
-        # Use ClientFactory.connect for automatic discovery and client creation
-        a2a_client = await ClientFactory.connect(SEARCH_AGENT_URL)
-        
-        message = Message(
-            role="user",
-            parts=[TextPart(text=f"Find jobs at {req.company}")],
-            message_id="web_search_" + os.urandom(4).hex()
-        )
-        
+        # Pooled client: the agent card and connection are reused across requests
+        a2a_client = await a2a_pool.get_client(SEARCH_AGENT_URL)
         # returns AsyncIterator[ClientEvent | Message]
-        response_stream = a2a_client.send_message(message)
-        
-        result_text = ""
-        async for update in response_stream:
-            if isinstance(update, Message):
-                for part in update.parts:
-                    if hasattr(part.root, 'text'):
-                        result_text += part.root.text
-            else:
-                task, _ = update
-                if task.status == "completed" and task.artifacts:
-                    result_text = ""
-                    for art in task.artifacts:
-                        for part in art.parts:
-                            if hasattr(part.root, 'text'):
-                                result_text += part.root.text
-        
-        if not result_text:
-            print("WEB BRIDGE WARNING: No text results found in stream/task.")
-            
-        return {"status": "success", "result": result_text}
+        updates = a2a_client.send_message(message, context=call_context()).__aiter__()
+        # Wait for the first event before answering, so a failed connect is still an HTTP error
+        with stage("bridge.a2a.search.connect", company=req.company):
+            first = await updates.__anext__()
+    except StopAsyncIteration:
+        first = None
     except Exception as e:
         print(f"WEB BRIDGE EXCEPTION in /search: {e}")
-        import traceback
-        traceback.print_exc()
+        a2a_pool.invalidate(SEARCH_AGENT_URL)
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def events():
+        if first is not None:
+            yield first
+            async for update in updates:
+                yield update
+
+    async def stream():
+        result_text = ""
+        received = False
+        task = None
+        try:
+            with stage("bridge.a2a.search", company=req.company):
+                async for update in events():
+                    if isinstance(update, Message):
+                        received = True
+                        result_text += "".join(p.root.text for p in update.parts if hasattr(p.root, "text"))
+                        continue
+                    task, event = update
+                    artifact = getattr(event, "artifact", None)
+                    if artifact is None:
+                        continue
+                    received = True
+                    # Relay each job chunk the moment it arrives
+                    for part in artifact.parts:
+                        if getattr(part.root, "kind", None) == "data":
+                            yield json.dumps({"job": part.root.data}) + "\n"
+                        elif hasattr(part.root, "text"):
+                            result_text += part.root.text
+            if task is not None and not received:
+                # Non-streaming agents deliver everything on the final task instead
+                for artifact in task.artifacts or []:
+                    for part in artifact.parts:
+                        if getattr(part.root, "kind", None) == "data":
+                            yield json.dumps({"job": part.root.data}) + "\n"
+                        elif hasattr(part.root, "text"):
+                            result_text += part.root.text
+            if not result_text:
+                print("WEB BRIDGE WARNING: No text results found in stream/task.")
+            # Search errors and timeouts end the task as failed, with the reason as its text
+            status = "failed" if task is not None and task.status.state == TaskState.failed else "success"
+            yield json.dumps({"status": status, "result": result_text}) + "\n"
+        except Exception as e:
+            print(f"WEB BRIDGE EXCEPTION in /search: {e}")
+            a2a_pool.invalidate(SEARCH_AGENT_URL)
+            yield json.dumps({"status": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/search/batch")
+async def search_jobs_batch(req: BatchSearchRequest):
+    """Searches many companies in one Search Agent task, streaming NDJSON lines per company."""
+    companies = [c.strip() for c in req.companies if c.strip()]
+    if not companies:
+        raise HTTPException(status_code=400, detail="No companies given")
+    print(f"WEB BRIDGE: Batch search for {len(companies)} companies via {SEARCH_AGENT_URL}...")
+    message = Message(
+        role="user",
+        parts=[TextPart(text="Find jobs at " + ", ".join(companies))],
+        message_id="web_batch_search_" + os.urandom(4).hex()
+    )
+
+    async def stream():
+        try:
+            a2a_client = await a2a_pool.get_client(SEARCH_AGENT_URL)
+            with stage("bridge.a2a.search_batch", companies=len(companies)):
+                async for update in a2a_client.send_message(message, context=call_context()):
+                    if isinstance(update, Message):
+                        continue
+                    _, event = update
+                    artifact = getattr(event, "artifact", None)
+                    if artifact is None:
+                        continue
+                    for part in artifact.parts:
+                        if getattr(part.root, "kind", None) == "data":
+                            yield json.dumps(part.root.data) + "\n"
+                        elif artifact.name is None and hasattr(part.root, "text"):
+                            yield json.dumps({"summary": part.root.text}) + "\n"
+        except Exception as e:
+            print(f"WEB BRIDGE EXCEPTION in /search/batch: {e}")
+            a2a_pool.invalidate(SEARCH_AGENT_URL)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.post("/apply")
 async def apply_job(req: ApplyRequest):
     print(f"WEB BRIDGE: Applying for {req.job_id} using {req.resume_name} via {APPLY_AGENT_URL}...")
     try:
-        a2a_client = await ClientFactory.connect(APPLY_AGENT_URL)
+        a2a_client = await a2a_pool.get_client(APPLY_AGENT_URL)
         
         message = Message(
             role="user",
@@ -89,46 +244,253 @@ async def apply_job(req: ApplyRequest):
             message_id="web_apply_" + os.urandom(4).hex()
         )
         
-        response_stream = a2a_client.send_message(message)
-        
         result_text = ""
-        async for update in response_stream:
-            if isinstance(update, Message):
-                for part in update.parts:
-                    if hasattr(part.root, 'text'):
-                        result_text += part.root.text
-            else:
-                task, _ = update
-                if task.status == "completed" and task.artifacts:
-                    result_text = ""
-                    for art in task.artifacts:
-                        for part in art.parts:
-                            if hasattr(part.root, 'text'):
-                                result_text += part.root.text
-                            
-        return {"status": "success", "result": result_text}
+        status = "success"
+        with stage("bridge.a2a.apply", job_id=req.job_id):
+            response_stream = a2a_client.send_message(message, context=call_context())
+
+            async for update in response_stream:
+                if isinstance(update, Message):
+                    for part in update.parts:
+                        if hasattr(part.root, 'text'):
+                            result_text += part.root.text
+                else:
+                    task, _ = update
+                    if task.status.state == TaskState.failed:
+                        status = "failed"
+                    if task.status.state in (TaskState.completed, TaskState.failed) and task.artifacts:
+                        result_text = ""
+                        for art in task.artifacts:
+                            for part in art.parts:
+                                if hasattr(part.root, 'text'):
+                                    result_text += part.root.text
+
+        return {"status": status, "result": result_text}
     except Exception as e:
         print(f"WEB BRIDGE EXCEPTION in /apply: {e}")
+        a2a_pool.invalidate(APPLY_AGENT_URL)
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/jobs")
-async def list_jobs():
-    jobs_dir = "data/jobs"
-    if not os.path.exists(jobs_dir):
-        return []
-    import json
-    files = [f for f in os.listdir(jobs_dir) if f.endswith(".json")]
-    jobs = []
-    for f in files:
+@app.post("/apply/bulk")
+async def apply_jobs_bulk(req: BulkApplyRequest):
+    """Applies for many jobs in one Apply Agent task, streaming NDJSON progress lines."""
+    job_ids = [j.strip() for j in req.job_ids if j.strip()]
+    if not job_ids:
+        raise HTTPException(status_code=400, detail="No job IDs given")
+    print(f"WEB BRIDGE: Bulk applying for {len(job_ids)} jobs using {req.resume_name} via {APPLY_AGENT_URL}...")
+    message = Message(
+        role="user",
+        parts=[TextPart(text=f"Apply for job IDs {', '.join(job_ids)} using {req.resume_name}")],
+        message_id="web_bulk_apply_" + os.urandom(4).hex()
+    )
+
+    async def stream():
         try:
-            with open(os.path.join(jobs_dir, f), 'r') as jf:
-                jobs.append(json.load(jf))
-        except:
-            continue
+            a2a_client = await a2a_pool.get_client(APPLY_AGENT_URL)
+            with stage("bridge.a2a.apply_bulk", jobs=len(job_ids)):
+                async for update in a2a_client.send_message(message, context=call_context()):
+                    if isinstance(update, Message):
+                        continue
+                    _, event = update
+                    artifact = getattr(event, "artifact", None)
+                    status = getattr(event, "status", None)
+                    if artifact is not None:
+                        parts = artifact.parts
+                    elif status is not None and status.message is not None:
+                        parts = status.message.parts
+                    else:
+                        continue
+                    for part in parts:
+                        if getattr(part.root, "kind", None) == "data":
+                            yield json.dumps(part.root.data) + "\n"
+                        elif artifact is not None and hasattr(part.root, "text"):
+                            yield json.dumps({"summary": part.root.text}) + "\n"
+        except Exception as e:
+            print(f"WEB BRIDGE EXCEPTION in /apply/bulk: {e}")
+            a2a_pool.invalidate(APPLY_AGENT_URL)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/jobs/search")
+def search_stored_jobs(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Keywords matched against title, description and company"),
+    company: Optional[str] = None,
+    cursor: int = Query(0, ge=0, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    # Ranked full-text query over the job store's FTS index
+    with stage("job_store.search"):
+        jobs, next_offset = get_store().search(q, company=company, offset=cursor, limit=limit)
+    if next_offset is not None:
+        response.headers["X-Next-Cursor"] = str(next_offset)
     return jobs
 
+@app.get("/jobs/rank")
+def rank_stored_jobs(
+    resume: str = Query(..., description="Resume file name in data/resumes"),
+    k: int = Query(10, ge=1, le=200),
+    company: Optional[str] = None,
+):
+    # Top-K relevance ranking of stored jobs against a resume (same engine as the Apply Agent skill)
+    if os.path.basename(resume) != resume:
+        raise HTTPException(status_code=400, detail="Invalid resume name")
+    try:
+        # numpy/scipy load on the first ranking request rather than at bridge startup
+        from apply_agent.ranking import rank_jobs
+        with stage("ranking.rank", resume=resume, k=k):
+            return rank_jobs(resume, top_k=k, company=company)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Resume {resume} not found")
+
+@app.get("/jobs")
+def list_jobs(
+    request: Request,
+    company: Optional[str] = None,
+    since: Optional[float] = Query(None, description="Only jobs added or updated after this UNIX timestamp"),
+    cursor: Optional[int] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return"),
+    status: Optional[str] = Query(None, pattern="^(open|closed)$", description="Only open or closed jobs"),
+):
+    # Sync handler: FastAPI runs it in the threadpool so SQLite reads don't block the loop
+    store = get_store()
+    projection = JOB_FIELDS
+    if fields:
+        projection = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in projection if f not in JOB_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    # The validator covers the store state plus the query, so every page/filter gets its own ETag
+    count, last_updated = store.version()
+    etag = '"' + hashlib.sha1(f"{count}:{last_updated}:{request.url.query}".encode()).hexdigest()[:16] + '"'
+    last_modified = formatdate(last_updated, usegmt=True)
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    not_modified = False
+    if if_none_match is not None:
+        not_modified = etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+    elif if_modified_since:
+        try:
+            not_modified = int(last_updated) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            pass
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    next_cursor = store.page_cursor(company=company, since=since, after=cursor, limit=limit, status=status)
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+
+    def body():
+        # One store page is read and encoded at a time, so large listings never sit in memory whole
+        pages = store.iter_pages(company=company, since=since, after=cursor, limit=limit, fields=projection,
+                                 status=status)
+        yield b"["
+        separator = b""
+        while True:
+            with stage("job_store.list_page"):
+                page = next(pages, None)
+            if page is None:
+                break
+            yield separator + dumps(page)[1:-1]
+            separator = b","
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+@app.get("/applications")
+def list_applications(
+    response: Response,
+    job_id: Optional[str] = None,
+    company: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[int] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    # Indexed query over the Apply Agent's application log
+    with stage("application_store.list_page"):
+        applications, next_cursor = get_application_store().list_page(
+            job_id=job_id, company=company, status=status, after=cursor, limit=limit
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return applications
+
+@app.get("/watch")
+def list_watches():
+    """Returns the re-crawl watch list and the Search Agent's queue depth."""
+    store = get_store()
+    return {"queue": store.watch_queue(), "watches": store.list_watches()}
+
+@app.post("/watch")
+def add_watch(req: WatchRequest):
+    # The Search Agent's scheduler picks the company up from the shared store on its next poll
+    company = req.company.strip()
+    if not company:
+        raise HTTPException(status_code=400, detail="No company given")
+    interval = req.interval or RECRAWL_INTERVAL
+    if not RECRAWL_MIN_INTERVAL <= interval <= RECRAWL_MAX_INTERVAL:
+        raise HTTPException(
+            status_code=400,
+            detail=f"interval must be between {RECRAWL_MIN_INTERVAL:.0f} and {RECRAWL_MAX_INTERVAL:.0f} seconds",
+        )
+    return get_store().add_watch(company, interval)
+
+@app.delete("/watch/{company}")
+def remove_watch(company: str):
+    if not get_store().remove_watch(company):
+        raise HTTPException(status_code=404, detail=f"{company} is not watched")
+    return {"status": "success"}
+
+@app.get("/events")
+async def job_events(request: Request):
+    """Server-Sent Events stream of `job` and `application` change events."""
+    queue = event_feed.subscribe()
+    replay_upto = event_feed.last_seq
+    last_event_id = request.headers.get("last-event-id")
+
+    async def stream():
+        sent = replay_upto
+        try:
+            if last_event_id and last_event_id.isdigit():
+                # Replay what the client missed while disconnected; newer events arrive via the queue
+                sent = int(last_event_id)
+                while sent < replay_upto:
+                    events = await asyncio.to_thread(get_store().events_after, sent)
+                    events = [e for e in events if e[0] <= replay_upto]
+                    if not events:
+                        break
+                    for seq, event_type, payload in events:
+                        yield {"id": str(seq), "event": event_type, "data": payload}
+                        sent = seq
+                sent = max(sent, replay_upto)
+            while queue in event_feed.subscribers or not queue.empty():
+                try:
+                    seq, event_type, payload = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    continue
+                if seq <= sent:
+                    continue
+                yield {"id": str(seq), "event": event_type, "data": payload}
+                sent = seq
+        finally:
+            event_feed.unsubscribe(queue)
+
+    return EventSourceResponse(stream(), ping=15)
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    import argparse
+    from search_agent.startup import run_server
+
+    parser = argparse.ArgumentParser(description="Web bridge between the GUI and the agents")
+    parser.add_argument("--workers", type=int, default=BRIDGE_WORKERS,
+                        help="Worker processes (0 = one per CPU core)")
+    args = parser.parse_args()
+    run_server("bridge:app", "127.0.0.1", 8000, args.workers, app=app)
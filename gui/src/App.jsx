@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 
 function App() {
   const [company, setCompany] = useState('');
@@ -9,11 +9,24 @@ function App() {
   const [resume, setResume] = useState(null);
   const [status, setStatus] = useState({ type: 'info', message: 'Ready' });
 
+  const jobsEtag = useRef(null);
+
   const fetchJobs = async () => {
     try {
-      const resp = await fetch('http://127.0.0.1:8000/jobs');
-      const data = await resp.json();
-      setJobs(data);
+      // Conditional request: the bridge answers 304 when nothing changed since the last poll
+      const headers = jobsEtag.current ? { 'If-None-Match': jobsEtag.current } : {};
+      let resp = await fetch('http://127.0.0.1:8000/jobs?limit=500', { headers });
+      if (resp.status === 304) return;
+      const etag = resp.headers.get('ETag');
+      let all = await resp.json();
+      let cursor = resp.headers.get('X-Next-Cursor');
+      while (cursor) {
+        resp = await fetch(`http://127.0.0.1:8000/jobs?limit=500&cursor=${cursor}`);
+        all = all.concat(await resp.json());
+        cursor = resp.headers.get('X-Next-Cursor');
+      }
+      jobsEtag.current = etag;
+      setJobs(all);
     } catch (err) {
       console.error("Failed to fetch jobs", err);
     }
@@ -21,8 +34,25 @@ function App() {
 
   useEffect(() => {
     fetchJobs();
-    const interval = setInterval(fetchJobs, 5000);
-    return () => clearInterval(interval);
+    // Server push instead of polling: the bridge streams job and application changes
+    const events = new EventSource('http://127.0.0.1:8000/events');
+    events.addEventListener('job', (e) => {
+      const { job } = JSON.parse(e.data);
+      setJobs((prev) => {
+        const idx = prev.findIndex((j) => j.id === job.id);
+        if (idx === -1) return [...prev, job];
+        const next = prev.slice();
+        next[idx] = job;
+        return next;
+      });
+    });
+    events.addEventListener('application', (e) => {
+      const { job_id } = JSON.parse(e.data);
+      setStatus({ type: 'success', message: `Application submitted for ${job_id}` });
+    });
+    // After a dropped connection, catch up with a (usually 304) conditional fetch
+    events.onopen = () => fetchJobs();
+    return () => events.close();
   }, []);
 
   const handleSearch = async (e) => {
@@ -36,9 +66,33 @@ function App() {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ company }),
       });
-      const data = await resp.json();
-      setStatus({ type: 'success', message: data.result });
-      fetchJobs();
+      // NDJSON stream: one {"job"} line per job as it is found, then a final {"status"} line
+      const reader = resp.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let found = 0;
+      for (;;) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const data = JSON.parse(line);
+          if (data.job) {
+            found += 1;
+            setStatus({ type: 'info', message: `Found ${found} jobs at ${company} so far...` });
+            setJobs((prev) => (prev.some((j) => j.id === data.job.id) ? prev : [...prev, data.job]));
+          } else if (data.status === 'success') {
+            setStatus({ type: 'success', message: data.result });
+          } else if (data.status === 'failed') {
+            setStatus({ type: 'error', message: data.result });
+          } else if (data.error) {
+            setStatus({ type: 'error', message: data.error });
+          }
+        }
+        if (done) break;
+      }
     } catch (err) {
       setStatus({ type: 'error', message: 'Search failed' });
     } finally {
@@ -64,7 +118,7 @@ function App() {
         }),
       });
       const data = await resp.json();
-      setStatus({ type: 'success', message: data.result });
+      setStatus({ type: data.status === 'failed' ? 'error' : 'success', message: data.result });
     } catch (err) {
       setStatus({ type: 'error', message: 'Application failed' });
     } finally {
@@ -1,19 +1,20 @@
+import argparse
+import asyncio
+import contextvars
+import functools
 import logging
 import os
 import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 # Add the parent directory to sys.path to allow imports from sibling directories if needed
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCard, AgentCapabilities, AgentSkill
-from google.adk import Runner
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.adk.artifacts import InMemoryArtifactService
 
 # For HostAgentExecutor (we can reuse the logic from samples, or define a simple one)
 # Since I cannot easily import HostAgentExecutor from the samples without copying, 
@@ -26,21 +27,58 @@ from google.adk.artifacts import InMemoryArtifactService
 
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.tasks import TaskUpdater
-from a2a.types import TaskState, TextPart
-from google.genai import types
+from a2a.types import DataPart, TaskState, TextPart
+
+from .enrich import ENRICH_ENABLED, PageEnricher
+from .intent import parse_intent
+from .llm import LLM_ENABLED, BudgetExceeded, LlmGateway
+from .recrawl import RECRAWL_ENABLED, RecrawlScheduler
+from .telemetry import MetricsMiddleware, metrics_endpoint, stage
+
+# Searches running at once, and the thread pool for blocking tool work (store reads and writes)
+SEARCH_MAX_CONCURRENCY = int(os.environ.get('SEARCH_MAX_CONCURRENCY', '8'))
+SEARCH_TIMEOUT = float(os.environ.get('SEARCH_TIMEOUT', '60'))
+# Server processes; 0 = one per CPU core (tasks, sessions and jobs are shared on disk)
+SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', '1'))
 
 class SearchAgentExecutor(AgentExecutor):
-    def __init__(self, runner: Runner, card: AgentCard):
-        self.runner = runner
+    def __init__(self, runner_factory, card: AgentCard,
+                 max_concurrency: int = SEARCH_MAX_CONCURRENCY, timeout: float = SEARCH_TIMEOUT,
+                 enricher: PageEnricher = None):
+        self._runner_factory = runner_factory
+        self._enricher = enricher
+        self._runner = None
         self._card = card
+        self._timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='search_tool')
+        # Backends do their own blocking I/O off the loop, so searches are bounded here instead
+        self._searches = asyncio.Semaphore(max_concurrency)
+        self._llm = LlmGateway('search_agent', lambda: self.runner)
+
+    @property
+    def runner(self):
+        """The ADK Runner, built on first use: parsed commands never need the LLM stack."""
+        if self._runner is None:
+            self._runner = self._runner_factory()
+        return self._runner
+
+    async def _run_tool(self, func, *args):
+        """Runs a synchronous tool off the event loop, bounded by the pool size and timeout."""
+        loop = asyncio.get_running_loop()
+        # Carry the trace context into the worker thread so tool spans join the request's trace
+        call = functools.partial(contextvars.copy_context().run, func, *args)
+        return await asyncio.wait_for(loop.run_in_executor(self._pool, call), self._timeout)
 
     async def execute(self, context, event_queue, response_trace=None):
+        with stage("search_agent.execute"):
+            await self._execute(context, event_queue)
+
+    async def _execute(self, context, event_queue):
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
         if not context.current_task:
             await updater.update_status(TaskState.submitted)
         await updater.update_status(TaskState.working)
 
-        # Simplified logic: bypass LLM for verification
         text = ""
         for part in context.message.parts:
             if part.root.kind == 'text':
@@ -48,40 +86,181 @@ class SearchAgentExecutor(AgentExecutor):
         
         print(f"Executing Search Agent with message: {text}")
         
-        if "find jobs" in text.lower() or "search" in text.lower():
-            # Mock extraction: search for company name
-            words = text.split()
-            company = words[-1] if words else "Google"
-            from .search_tools import search_jobs
-            results_json = search_jobs(company)
-            import json
-            results = json.loads(results_json)
-            response_text = f"I searched for jobs at {company} and found {len(results)} results."
-        elif "get job details" in text.lower() or "job id" in text.lower():
-            words = text.split()
-            job_id = words[-1]
-            from .search_tools import get_job_details
-            details = get_job_details(job_id)
-            response_text = f"Details for job {job_id}: {details}"
+        # Well-formed commands are routed without the LLM; everything else goes to the Runner
+        intent = parse_intent(text)
+        action = intent.action if intent else None
+        try:
+            if action == "search_batch":
+                await self._execute_batch(updater, list(intent.companies))
+            elif action == "search":
+                await self._execute_search(updater, intent.companies[0])
+            elif action == "job_details":
+                await self._execute_details(updater, list(intent.job_ids))
+            else:
+                await self._execute_llm(updater, context, text)
+        except asyncio.TimeoutError:
+            await updater.add_artifact([TextPart(text=f"Search timed out after {self._timeout:.0f}s.")])
+            await updater.update_status(TaskState.failed, final=True)
+
+    async def _execute_details(self, updater, job_ids: list):
+        from .search_tools import lookup_jobs
+        import json
+        details = await self._run_tool(lookup_jobs, job_ids)
+        if len(job_ids) == 1:
+            job = details["jobs"].get(job_ids[0])
+            found = json.dumps(job, indent=2) if job else f"Job with ID {job_ids[0]} not found."
+            response_text = f"Details for job {job_ids[0]}: {found}"
         else:
-            response_text = f"I received your message: {text}. I am a Search Agent and I can find jobs for you."
+            response_text = f"Details for {len(details['jobs'])} of {len(job_ids)} jobs."
+        # Structured copy for agent callers, so they don't have to parse the text
+        await updater.add_artifact([TextPart(text=response_text), DataPart(data=details)], name="job_details")
+        await updater.update_status(TaskState.completed, final=True)
+
+    async def _execute_llm(self, updater, context, text: str):
+        """Answers free-form messages with the ADK Runner (through the cache and budgets), if enabled."""
+        if not LLM_ENABLED:
+            response_text = (f"I received your message: {text}. I am a Search Agent and I can find jobs for you. "
+                             f"Try e.g. \"Find jobs at Google\" or \"Get details for job IDs: <id>\".")
+            await updater.add_artifact([TextPart(text=response_text)])
+            await updater.update_status(TaskState.completed, final=True)
+            return
+        try:
+            reply = await asyncio.wait_for(
+                # Follow-ups in an existing task depend on the conversation, so they bypass the cache
+                self._llm.ask(text, session_id=context.context_id, cacheable=context.current_task is None),
+                self._timeout,
+            )
+        except BudgetExceeded as e:
+            await updater.add_artifact([TextPart(text=str(e))])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            await updater.add_artifact([TextPart(text=f"Error running the Search Agent model: {e}")])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        await updater.add_artifact([TextPart(text=reply.text or "(no answer)")], metadata={"cached": reply.cached})
+        await updater.update_status(TaskState.completed, final=True)
+
+    async def _execute_search(self, updater, company: str):
+        """Streams the company's jobs as chunks of one `jobs` artifact, one DataPart per job.
+
+        Each chunk is sent as soon as the search backend's results are stored,
+        so callers see the first jobs before slower sources have answered.
+        """
+        from .search_tools import iter_search_jobs
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        artifact_id = uuid.uuid4().hex
+        await asyncio.wait_for(self._searches.acquire(), deadline - loop.time())
+        chunks = iter_search_jobs(company, executor=self._pool)
+        found = []
+        try:
+            while True:
+                try:
+                    jobs = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                await updater.add_artifact(
+                    [DataPart(data=job.as_dict()) for job in jobs],
+                    artifact_id=artifact_id, name="jobs", append=bool(found),
+                )
+                found.extend(jobs)
+        except asyncio.TimeoutError:
+            # execute() reports timeouts the same way for every tool
+            raise
+        except Exception as e:
+            await updater.add_artifact([TextPart(text=f"Error searching for jobs: {e}")])
+            await updater.update_status(TaskState.failed, final=True)
+            return
+        finally:
+            await chunks.aclose()
+            self._searches.release()
+        if self._enricher is not None:
+            # Job pages are fetched after the reply, so the caller never waits for them
+            self._enricher.submit(found)
+        await updater.add_artifact(
+            [TextPart(text=f"I searched for jobs at {company} and found {len(found)} results.")]
+        )
+        await updater.update_status(TaskState.completed, final=True)
+
+    async def _execute_batch(self, updater, companies: list):
+        """Streams one artifact per company as its search finishes."""
+        from .search_tools import iter_search_jobs_batch
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def produce():
+            try:
+                for item in iter_search_jobs_batch(companies):
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
 
-        response_parts = [TextPart(text=response_text)]
-        await updater.add_artifact(response_parts)
+        # A batch takes one search slot; it fans out on its own global pool and this thread only drains it
+        await asyncio.wait_for(self._searches.acquire(), self._timeout)
+        try:
+            producer = loop.run_in_executor(self._pool, contextvars.copy_context().run, produce)
+            found = []
+            while True:
+                item = await asyncio.wait_for(queue.get(), self._timeout)
+                if item is None:
+                    break
+                company, jobs, error = item
+                found.extend(jobs)
+                summary = error or f"Found {len(jobs)} results at {company}."
+                jobs = [job.as_dict() for job in jobs]
+                await updater.add_artifact(
+                    [TextPart(text=summary), DataPart(data={"company": company, "jobs": jobs, "error": error})],
+                    name=company,
+                )
+            await producer
+        finally:
+            self._searches.release()
+        if self._enricher is not None:
+            self._enricher.submit(found)
+        await updater.add_artifact(
+            [TextPart(text=f"I searched for jobs at {len(companies)} companies and found {len(found)} results.")]
+        )
         await updater.update_status(TaskState.completed, final=True)
-            # Handle intermediate steps/updates if necessary
 
     async def cancel(self, context, event_queue):
         pass # simple implementation
 
-from .agent import create_search_agent
+from .task_store import create_runner_services, create_task_store
 
 DEFAULT_HOST = '127.0.0.1'
 DEFAULT_PORT = 10001 # Search Agent on 10001 (Apply on 10002)
 
-def main():
-    agent = create_search_agent()
-    
+def build_runner(app_name: str):
+    # google.adk and google.genai take seconds to import, so they load only when the LLM path runs
+    from google.adk import Runner
+    from .agent import create_search_agent
+
+    return Runner(app_name=app_name, agent=create_search_agent(), auto_create_session=True,
+                  **create_runner_services('search'))
+
+def with_background_tasks(app, enricher: PageEnricher = None):
+    """Runs the RecrawlScheduler (if enabled) alongside the app and closes the enricher on shutdown."""
+    inner = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        task = asyncio.create_task(RecrawlScheduler(enricher=enricher).run()) if RECRAWL_ENABLED else None
+        try:
+            async with inner(app) as state:
+                yield state
+        finally:
+            if task is not None:
+                task.cancel()
+            if enricher is not None:
+                await enricher.aclose()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+def build_app():
     # Use localhost for the public URL, but bind to 0.0.0.0
     app_url = os.environ.get('SEARCH_AGENT_URL', f'http://localhost:{DEFAULT_PORT}')
     
@@ -91,7 +270,7 @@ def main():
         name='Search Jobs',
         description='Searches for jobs by company name',
         tags=['search', 'jobs'],
-        examples=['Find jobs at Google'],
+        examples=['Find jobs at Google', 'Find jobs at Google, Microsoft, and Amazon'],
     )
     
     agent_card = AgentCard(
@@ -105,23 +284,33 @@ def main():
         skills=[skill],
     )
     
-    runner = Runner(
-        app_name=agent_card.name,
-        agent=agent,
-        artifact_service=InMemoryArtifactService(),
-        session_service=InMemorySessionService(),
-        memory_service=InMemoryMemoryService(),
-    )
-    
-    executor = SearchAgentExecutor(runner, agent_card)
-    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+    enricher = PageEnricher() if ENRICH_ENABLED else None
+    executor = SearchAgentExecutor(lambda: build_runner(agent_card.name), agent_card, enricher=enricher)
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=create_task_store('search'))
     
     # Create A2A application
     a2a_app = A2AStarletteApplication(agent_card=agent_card, http_handler=handler)
     app = a2a_app.build()
-    
+    app.add_middleware(MetricsMiddleware, name="search_agent")
+    app.add_route("/metrics", metrics_endpoint)
+    return with_background_tasks(app, enricher)
+
+def main():
+    parser = argparse.ArgumentParser(description='Search Agent A2A server')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Report import and app build times instead of serving')
+    parser.add_argument('--workers', type=int, default=SEARCH_WORKERS,
+                        help='Worker processes (0 = one per CPU core)')
+    args = parser.parse_args()
+    if args.profile_startup:
+        from .startup import profile_startup
+        profile_startup('search_agent.__main__')
+        return
+
     # Run server
-    uvicorn.run(app, host=DEFAULT_HOST, port=DEFAULT_PORT)
+    from .startup import run_server
+    run_server('search_agent.__main__:build_app', DEFAULT_HOST, DEFAULT_PORT, args.workers,
+               factory=True, app=build_app)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,488 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Optional
+
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, BaseArtifactService
+from google.adk.errors.input_validation_error import InputValidationError
+from google.adk.memory.base_memory_service import BaseMemoryService, SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions.sqlite_session_service import SqliteSessionService as AdkSqliteSessionService
+from google.adk.sessions.state import State
+from google.genai import types
+
+# Sessions idle this many seconds are deleted (0 = keep forever)
+SESSION_TTL = float(os.environ.get('SESSION_TTL', str(24 * 3600)))
+SESSION_MAX = int(os.environ.get('SESSION_MAX', '10000'))
+# Recently used sessions kept in memory, so a turn doesn't reload the whole event history
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '256'))
+MEMORY_TTL = float(os.environ.get('MEMORY_TTL', str(30 * 24 * 3600)))
+MEMORY_MAX_ENTRIES = int(os.environ.get('MEMORY_MAX_ENTRIES', '100000'))
+ARTIFACT_TTL = float(os.environ.get('ARTIFACT_TTL', str(7 * 24 * 3600)))
+# Total size of stored artifact blobs; the oldest versions are deleted beyond it
+ARTIFACT_MAX_BYTES = int(os.environ.get('ARTIFACT_MAX_BYTES', str(1 << 30)))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqliteSessionService(AdkSqliteSessionService):
+    """ADK's SQLite session service with an LRU hot tier, idle expiry and a size cap.
+
+    The `cache_size` most recently used sessions stay in memory, so a turn
+    only reads the app and user state instead of every stored event. Sessions
+    idle for `ttl` seconds are deleted with their events, and beyond
+    `max_sessions` the least recently updated ones go first. With
+    `cache_size=0` every read goes to SQLite, so several worker processes
+    can share one database.
+    """
+
+    def __init__(self, db_path: str, ttl: float = SESSION_TTL, max_sessions: int = SESSION_MAX,
+                 cache_size: int = SESSION_CACHE_SIZE, evict_interval: float = 60.0):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(_connect(db_path)):
+            pass  # WAL mode is persistent; ADK's own connections inherit it
+        super().__init__(db_path)
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.cache_size = cache_size
+        self.evict_interval = evict_interval
+        self._cache = OrderedDict()  # (app_name, user_id, session_id) -> Session
+        self._last_evict = 0.0
+
+    def _remember(self, session):
+        if not self.cache_size:
+            return
+        key = (session.app_name, session.user_id, session.id)
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None):
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state,
+                                               session_id=session_id)
+        self._remember(session)
+        await self._maybe_evict()
+        return session.model_copy(deep=True)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config=None):
+        cached = self._cache.get((app_name, user_id, session_id)) if config is None else None
+        if cached is None:
+            session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id,
+                                                config=config)
+            if session is not None and config is None:
+                self._remember(session)
+            return session.model_copy(deep=True) if session is not None and config is None else session
+        self._cache.move_to_end((app_name, user_id, session_id))
+        session = cached.model_copy(deep=True)
+        # App and user state are shared with other sessions, so they are always read fresh
+        async with self._get_db_connection() as db:
+            app_state = await self._get_app_state(db, app_name)
+            user_state = await self._get_user_state(db, app_name, user_id)
+        session.state = {k: v for k, v in session.state.items()
+                         if not k.startswith((State.APP_PREFIX, State.USER_PREFIX))}
+        session.state.update({State.APP_PREFIX + k: v for k, v in app_state.items()})
+        session.state.update({State.USER_PREFIX + k: v for k, v in user_state.items()})
+        return session
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._cache.pop((app_name, user_id, session_id), None)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session, event):
+        event = await super().append_event(session, event)
+        key = (session.app_name, session.user_id, session.id)
+        if not event.partial and key in self._cache:
+            # The caller's copy now holds the new event; keep a private copy of it
+            self._remember(session.model_copy(deep=True))
+        await self._maybe_evict()
+        return event
+
+    async def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_evict < self.evict_interval:
+            return
+        self._last_evict = now
+        async with self._get_db_connection() as db:
+            expired = []
+            if self.ttl:
+                async with db.execute("SELECT app_name, user_id, id FROM sessions WHERE update_time < ?",
+                                      (now - self.ttl,)) as cursor:
+                    expired += [tuple(row) for row in await cursor.fetchall()]
+            if self.max_sessions:
+                async with db.execute(
+                    "SELECT app_name, user_id, id FROM sessions ORDER BY update_time DESC LIMIT -1 OFFSET ?",
+                    (self.max_sessions,),
+                ) as cursor:
+                    expired += [tuple(row) for row in await cursor.fetchall()]
+            if not expired:
+                return
+            # Foreign keys are on for ADK's connections, so events are deleted with their session
+            await db.executemany("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                                 list(set(expired)))
+            await db.commit()
+        for key in expired:
+            self._cache.pop(key, None)
+
+
+MEMORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    author TEXT,
+    text TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(text, content='memories', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+"""
+
+
+class SqliteMemoryService(BaseMemoryService):
+    """Long-term ADK memory in SQLite with a full-text index.
+
+    Like ADK's InMemoryMemoryService, a search returns every remembered
+    event sharing a word with the query, but the lookup is an FTS5 query
+    instead of a scan. Entries older than `ttl` seconds are deleted, and
+    beyond `max_entries` the oldest ones go first.
+    """
+
+    def __init__(self, db_path: str, ttl: float = MEMORY_TTL, max_entries: int = MEMORY_MAX_ENTRIES,
+                 evict_interval: float = 60.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self._local = threading.local()
+        self._last_evict = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(MEMORY_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.db_path)
+        return conn
+
+    async def add_session_to_memory(self, session) -> None:
+        await self.add_events_to_memory(app_name=session.app_name, user_id=session.user_id,
+                                        events=session.events, session_id=session.id)
+
+    async def add_events_to_memory(self, *, app_name: str, user_id: str, events, session_id: str = None,
+                                   custom_metadata=None) -> None:
+        rows = []
+        for event in events:
+            if not event.content or not event.content.parts:
+                continue
+            text = " ".join(part.text for part in event.content.parts if part.text)
+            if not text.strip():
+                continue
+            rows.append((app_name, user_id, session_id or "", event.id, event.author, text,
+                         event.content.model_dump_json(exclude_none=True), event.timestamp))
+        if rows:
+            await asyncio.to_thread(self._add_sync, rows)
+
+    def _add_sync(self, rows: list):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO memories"
+                " (app_name, user_id, session_id, event_id, author, text, content, timestamp)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if now - self._last_evict >= self.evict_interval:
+                self._last_evict = now
+                if self.ttl:
+                    conn.execute("DELETE FROM memories WHERE timestamp < ?", (now - self.ttl,))
+                if self.max_entries:
+                    conn.execute(
+                        "DELETE FROM memories WHERE rowid IN "
+                        "(SELECT rowid FROM memories ORDER BY timestamp DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+
+    async def search_memory(self, *, app_name: str, user_id: str, query: str) -> SearchMemoryResponse:
+        words = {w.lower() for w in _WORD_RE.findall(query)}
+        if not words:
+            return SearchMemoryResponse()
+        rows = await asyncio.to_thread(self._search_sync, app_name, user_id, words)
+        return SearchMemoryResponse(memories=[
+            MemoryEntry(
+                content=types.Content.model_validate_json(row["content"]),
+                author=row["author"],
+                timestamp=datetime.fromtimestamp(row["timestamp"]).isoformat(),
+            )
+            for row in rows
+        ])
+
+    def _search_sync(self, app_name: str, user_id: str, words: set) -> list:
+        match = " OR ".join('"' + w.replace('"', '""') + '"' for w in sorted(words))
+        return self._conn().execute(
+            """
+            SELECT m.author, m.content, m.timestamp FROM memories_fts
+            JOIN memories m ON m.rowid = memories_fts.rowid
+            WHERE memories_fts MATCH ? AND m.app_name = ? AND m.user_id = ?
+            ORDER BY m.timestamp
+            """,
+            (match, app_name, user_id),
+        ).fetchall()
+
+
+ARTIFACT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    mime_type TEXT,
+    blob TEXT,
+    part TEXT,
+    size INTEGER NOT NULL,
+    metadata TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, scope, filename, version)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_created_at ON artifacts(created_at);
+"""
+
+# Scope of "user:" artifacts, which are shared by all of a user's sessions
+_USER_SCOPE = "\x00user"
+
+
+class FileArtifactService(BaseArtifactService):
+    """ADK artifacts with metadata in SQLite and payloads as files beside it.
+
+    Payload bytes never enter the database: each version is written once to
+    `<root>/blobs/` and read back when loaded. Versions older than `ttl`
+    seconds are deleted, and once blobs exceed `max_bytes` in total the
+    oldest versions go first.
+    """
+
+    def __init__(self, root_dir: str, ttl: float = ARTIFACT_TTL, max_bytes: int = ARTIFACT_MAX_BYTES,
+                 evict_interval: float = 60.0):
+        self.root_dir = root_dir
+        self.blob_dir = os.path.join(root_dir, "blobs")
+        self.db_path = os.path.join(root_dir, "artifacts.db")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._local = threading.local()
+        self._last_evict = 0.0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(ARTIFACT_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.db_path)
+        return conn
+
+    @staticmethod
+    def _scope(filename: str, session_id: Optional[str]) -> str:
+        if filename.startswith("user:"):
+            return _USER_SCOPE
+        if session_id is None:
+            raise InputValidationError("Session ID must be provided for session-scoped artifacts.")
+        return session_id
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.blob_dir, blob[:2], blob)
+
+    def _version(self, row: sqlite3.Row) -> ArtifactVersion:
+        if row["kind"] == "file":
+            uri = json.loads(row["part"])["file_data"].get("file_uri")
+        else:
+            uri = f"file://{self._blob_path(row['blob'])}"
+        return ArtifactVersion(
+            version=row["version"], canonical_uri=uri, custom_metadata=json.loads(row["metadata"] or "{}"),
+            create_time=row["created_at"], mime_type=row["mime_type"],
+        )
+
+    async def save_artifact(self, *, app_name: str, user_id: str, filename: str, artifact: types.Part,
+                            session_id: Optional[str] = None, custom_metadata: Optional[dict[str, Any]] = None) -> int:
+        scope = self._scope(filename, session_id)
+        if artifact.inline_data is not None:
+            kind, payload, part = "inline", artifact.inline_data.data or b"", None
+            mime_type = artifact.inline_data.mime_type
+        elif artifact.text is not None:
+            kind, payload, mime_type, part = "text", artifact.text.encode("utf-8"), "text/plain", None
+        elif artifact.file_data is not None:
+            # References to external files carry no payload of their own
+            kind, payload, mime_type = "file", None, artifact.file_data.mime_type
+            part = artifact.model_dump_json(exclude_none=True)
+        else:
+            raise InputValidationError("Not supported artifact type.")
+        return await asyncio.to_thread(
+            self._save_sync, app_name, user_id, scope, filename, kind, payload, mime_type, part, custom_metadata
+        )
+
+    def _save_sync(self, app_name, user_id, scope, filename, kind, payload, mime_type, part, custom_metadata) -> int:
+        blob = None
+        if payload is not None:
+            blob = uuid.uuid4().hex
+            path = self._blob_path(blob)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute(
+                "SELECT COALESCE(MAX(version) + 1, 0) FROM artifacts"
+                " WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+                (app_name, user_id, scope, filename),
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO artifacts (app_name, user_id, scope, filename, version, kind, mime_type, blob, part,"
+                " size, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, scope, filename, version, kind, mime_type, blob, part, len(payload or b""),
+                 json.dumps(custom_metadata) if custom_metadata else None, now),
+            )
+        if now - self._last_evict >= self.evict_interval:
+            self._last_evict = now
+            self._evict(now)
+        return version
+
+    def _evict(self, now: float):
+        conn = self._conn()
+        expired = []
+        if self.ttl:
+            expired += conn.execute("SELECT rowid, blob FROM artifacts WHERE created_at < ?",
+                                    (now - self.ttl,)).fetchall()
+        if self.max_bytes:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+            if total > self.max_bytes:
+                for row in conn.execute("SELECT rowid, blob, size FROM artifacts ORDER BY created_at"):
+                    if total <= self.max_bytes:
+                        break
+                    expired.append(row)
+                    total -= row["size"]
+        self._delete_rows(expired)
+
+    def _delete_rows(self, rows: list):
+        if not rows:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany("DELETE FROM artifacts WHERE rowid = ?", [(row["rowid"],) for row in rows])
+        for row in rows:
+            if row["blob"]:
+                try:
+                    os.remove(self._blob_path(row["blob"]))
+                except FileNotFoundError:
+                    pass
+
+    def _read_blob(self, blob: str) -> bytes:
+        # A genai Part needs its own bytes, so a plain read is the cheapest load
+        with open(self._blob_path(blob), "rb") as f:
+            return f.read()
+
+    def _row(self, app_name, user_id, scope, filename, version):
+        sql = ("SELECT * FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?")
+        params = [app_name, user_id, scope, filename]
+        if version is None:
+            sql += " ORDER BY version DESC LIMIT 1"
+        else:
+            sql += " AND version = ?"
+            params.append(version)
+        return self._conn().execute(sql, params).fetchone()
+
+    def _load_sync(self, app_name, user_id, scope, filename, version):
+        row = self._row(app_name, user_id, scope, filename, version)
+        if row is None:
+            return None
+        if row["kind"] == "file":
+            return types.Part.model_validate_json(row["part"])
+        try:
+            data = self._read_blob(row["blob"])
+        except FileNotFoundError:
+            return None
+        if row["kind"] == "text":
+            return types.Part(text=data.decode("utf-8"))
+        return types.Part(inline_data=types.Blob(mime_type=row["mime_type"], data=data))
+
+    async def load_artifact(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None,
+                            version: Optional[int] = None) -> Optional[types.Part]:
+        scope = self._scope(filename, session_id)
+        return await asyncio.to_thread(self._load_sync, app_name, user_id, scope, filename, version)
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: Optional[str] = None) -> list[str]:
+        scopes = [_USER_SCOPE] + ([session_id] if session_id else [])
+        placeholders = ", ".join("?" * len(scopes))
+        rows = await asyncio.to_thread(lambda: self._conn().execute(
+            f"SELECT DISTINCT filename FROM artifacts WHERE app_name = ? AND user_id = ? AND scope IN ({placeholders})",
+            (app_name, user_id, *scopes),
+        ).fetchall())
+        return sorted(row[0] for row in rows)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, filename: str,
+                              session_id: Optional[str] = None) -> None:
+        scope = self._scope(filename, session_id)
+        await asyncio.to_thread(lambda: self._delete_rows(self._conn().execute(
+            "SELECT rowid, blob FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+            (app_name, user_id, scope, filename),
+        ).fetchall()))
+
+    def _versions_sync(self, app_name, user_id, scope, filename) -> list:
+        return self._conn().execute(
+            "SELECT * FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?"
+            " ORDER BY version",
+            (app_name, user_id, scope, filename),
+        ).fetchall()
+
+    async def list_versions(self, *, app_name: str, user_id: str, filename: str,
+                            session_id: Optional[str] = None) -> list[int]:
+        scope = self._scope(filename, session_id)
+        rows = await asyncio.to_thread(self._versions_sync, app_name, user_id, scope, filename)
+        return [row["version"] for row in rows]
+
+    async def list_artifact_versions(self, *, app_name: str, user_id: str, filename: str,
+                                     session_id: Optional[str] = None) -> list[ArtifactVersion]:
+        scope = self._scope(filename, session_id)
+        rows = await asyncio.to_thread(self._versions_sync, app_name, user_id, scope, filename)
+        return [self._version(row) for row in rows]
+
+    async def get_artifact_version(self, *, app_name: str, user_id: str, filename: str,
+                                   session_id: Optional[str] = None,
+                                   version: Optional[int] = None) -> Optional[ArtifactVersion]:
+        scope = self._scope(filename, session_id)
+        row = await asyncio.to_thread(self._row, app_name, user_id, scope, filename, version)
+        return self._version(row) if row is not None else None
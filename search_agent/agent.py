@@ -1,11 +1,12 @@
 from google.adk import Agent
-from .search_tools import search_jobs, get_job_details
+from .llm import create_model, generate_config
+from .search_tools import search_jobs, search_jobs_batch, get_job_details, get_jobs_details
 
 def create_search_agent() -> Agent:
     """Creates the Search Agent instance."""
     
     agent = Agent(
-        model='gemini-2.5-flash-lite', # Using a lightweight model
+        model=create_model(), # gemini-2.5-flash-lite unless LLM_MODEL says otherwise
         name='Search_Agent',
         instruction="""
         You are a Search Agent. Your goal is to find job listings for specific companies.
@@ -13,10 +14,12 @@ def create_search_agent() -> Agent:
         You also have `get_job_details` to retrieve stored job information relative to a job ID.
         
         When asked to find jobs for a company, use `search_jobs`.
-        When asked about a specific job ID, use `get_job_details`.
+        When asked to find jobs for several companies at once, use `search_jobs_batch` with the list of names.
+        When asked about a specific job ID, use `get_job_details`; for several job IDs, use `get_jobs_details`.
         
         Always return the information you find clearly.
         """,
-        tools=[search_jobs, get_job_details],
+        generate_content_config=generate_config(),
+        tools=[search_jobs, search_jobs_batch, get_job_details, get_jobs_details],
     )
     return agent
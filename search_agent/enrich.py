@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import httpx
+
+from .job_store import get_store
+from .telemetry import counter, stage
+
+# Off by default: set to "1" to let the Search Agent fetch every found job's page from its third-party site
+ENRICH_ENABLED = os.environ.get('ENRICH_ENABLED', '0') == '1'
+ENRICH_MAX_CONCURRENCY = int(os.environ.get('ENRICH_MAX_CONCURRENCY', '16'))
+# Concurrent fetches per host, so one job board never sees a burst
+ENRICH_PER_HOST = int(os.environ.get('ENRICH_PER_HOST', '2'))
+ENRICH_TIMEOUT = float(os.environ.get('ENRICH_TIMEOUT', '15'))
+# Pages fetched more recently than this many seconds are not re-requested at all
+ENRICH_MAX_AGE = float(os.environ.get('ENRICH_MAX_AGE', str(24 * 3600)))
+# Larger responses are cut off here; posting text is near the top of the page
+ENRICH_MAX_BYTES = int(os.environ.get('ENRICH_MAX_BYTES', str(2 << 20)))
+ENRICH_MAX_CHARS = int(os.environ.get('ENRICH_MAX_CHARS', '20000'))
+ENRICH_EXTRACT_WORKERS = int(os.environ.get('ENRICH_EXTRACT_WORKERS', '2'))
+
+enrich_fetches = counter("enrich_fetches_total", "Job page fetches by outcome.", ("result",))
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form",
+              "button", "iframe", "select"}
+_BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table", "section", "article", "main",
+               "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "hr"}
+_MAIN_TAGS = {"main", "article"}
+_SPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+
+
+class _TextExtractor(HTMLParser):
+    """Collects a page's visible text, the text inside <main>/<article>, and its JSON-LD blocks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text = []
+        self.main = []
+        self.json_ld = []
+        self._skip = 0
+        self._main = 0
+        self._json_ld = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and dict(attrs).get("type") == "application/ld+json":
+            self._json_ld = []
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _MAIN_TAGS or dict(attrs).get("role") == "main":
+            self._main += 1
+        if tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._json_ld is not None:
+            self.json_ld.append("".join(self._json_ld))
+            self._json_ld = None
+        if tag in _SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in _MAIN_TAGS and self._main:
+            self._main -= 1
+        if tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+        elif not self._skip:
+            self._append(data)
+
+    def _append(self, data: str):
+        self.text.append(data)
+        if self._main:
+            self.main.append(data)
+
+
+def _clean(chunks: list) -> str:
+    lines = (_SPACE_RE.sub(" ", line).strip() for line in "".join(chunks).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _job_posting_description(blocks: list):
+    # Job boards embed the posting as schema.org JobPosting JSON-LD; its description is the cleanest source
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting" and item.get("description"):
+                return str(item["description"])
+    return None
+
+
+def extract_text(html: str, max_chars: int = ENRICH_MAX_CHARS) -> str:
+    """Extracts the main posting text from a job page.
+
+    Prefers the schema.org JobPosting description, then the text inside
+    <main> or <article>, then all visible text; navigation, headers, footers,
+    forms and scripts are dropped.
+
+    Args:
+        html: The page's HTML (plain text passes through unchanged).
+        max_chars: Longest text to return.
+
+    Returns:
+        The text, one block per line.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    description = _job_posting_description(parser.json_ld)
+    if description:
+        # The description is itself HTML
+        inner = _TextExtractor()
+        inner.feed(description)
+        inner.close()
+        text = _clean(inner.text)
+    else:
+        text = _clean(parser.main) or _clean(parser.text)
+    return text[:max_chars]
+
+
+class PageEnricher:
+    """Fetches job pages and stores their posting text next to the job.
+
+    Pages are fetched concurrently over one pooled HTTP client, at most
+    `max_concurrency` at a time and `per_host` per host. A page fetched
+    before is re-requested with its ETag / Last-Modified validators, so an
+    unchanged posting costs a 304 and no parsing. Text extraction runs on a
+    small thread pool, off the event loop.
+    """
+
+    def __init__(self, max_concurrency: int = ENRICH_MAX_CONCURRENCY, per_host: int = ENRICH_PER_HOST,
+                 timeout: float = ENRICH_TIMEOUT, max_age: float = ENRICH_MAX_AGE,
+                 max_bytes: int = ENRICH_MAX_BYTES, extract_workers: int = ENRICH_EXTRACT_WORKERS):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._pool = ThreadPoolExecutor(max_workers=extract_workers, thread_name_prefix='enrich_extract')
+        self._client = None
+        self._semaphore = None
+        self._hosts = {}  # host -> [semaphore, users]
+        self._tasks = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.max_concurrency, keepalive_expiry=60)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True,
+                                             headers={"User-Agent": "searchjobs-enricher/0.1"})
+        return self._client
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+
+    def submit(self, jobs: list):
+        """Enriches `jobs` in the background; failures are logged, never raised to the caller."""
+        if not jobs:
+            return
+        task = asyncio.get_running_loop().create_task(self._enrich_logged(list(jobs)))
+        # Keep a reference until it finishes, or the task may be garbage-collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _enrich_logged(self, jobs: list):
+        try:
+            await self.enrich(jobs)
+        except Exception as e:
+            print(f"Job page enrichment failed: {e}")
+
+    async def enrich(self, jobs: list) -> dict:
+        """Fetches the pages of `jobs` that are missing or older than `max_age` and stores their text.
+
+        Args:
+            jobs: JobRecords; jobs without an http(s) `url` are skipped.
+
+        Returns:
+            Counts of `fetched`, `not_modified`, `failed` and `skipped` pages,
+            and of pages whose stored text `changed`.
+        """
+        store = get_store()
+        jobs = {job.id: job for job in jobs if job.url and job.url.startswith(("http://", "https://"))}
+        jobs = list(jobs.values())
+        pages = await asyncio.to_thread(store.get_pages, [job.id for job in jobs])
+        now = time.time()
+        due = [job for job in jobs if job.id not in pages or pages[job.id]["url"] != job.url
+               or now - pages[job.id]["fetched_at"] >= self.max_age]
+        counts = {"fetched": 0, "not_modified": 0, "failed": 0, "skipped": len(jobs) - len(due), "changed": 0}
+        if not due:
+            return counts
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        with stage("enrich.batch", jobs=len(due)):
+            results = await asyncio.gather(*(self._fetch(job, pages.get(job.id)) for job in due))
+        for _, outcome in results:
+            counts[outcome] += 1
+        counts["changed"] = await asyncio.to_thread(store.save_pages, [page for page, _ in results])
+        return counts
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str):
+        entry = self._hosts.setdefault(host, [asyncio.Semaphore(self.per_host), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._hosts[host]
+
+    async def _fetch(self, job, old: dict) -> tuple:
+        """Fetches one page; returns the page dict to store and the outcome counted for it."""
+        # fetched_at only moves on a 200 or 304, so a failed fetch is retried on the next pass
+        page = {"job_id": job.id, "url": job.url, "text": None, "etag": None, "last_modified": None,
+                "status": None, "error": None, "fetched_at": 0.0}
+        headers = {}
+        if old is not None and old["url"] == job.url:
+            # Keep the previous text if this fetch fails or the page is unchanged
+            page.update(text=old["text"], etag=old["etag"], last_modified=old["last_modified"],
+                        fetched_at=old["fetched_at"])
+            if old["etag"]:
+                headers["If-None-Match"] = old["etag"]
+            if old["last_modified"]:
+                headers["If-Modified-Since"] = old["last_modified"]
+        try:
+            async with self._semaphore, self._host_slot(urlsplit(job.url).netloc.lower()):
+                with stage("enrich.fetch"):
+                    body, response = await self._get(job.url, headers)
+            page["status"] = response.status_code
+            if response.status_code == 304:
+                page["fetched_at"] = time.time()
+                enrich_fetches.inc("not_modified")
+                return page, "not_modified"
+            if response.status_code >= 400:
+                raise ValueError(f"HTTP {response.status_code}")
+            content_type = response.headers.get("content-type", "text/html").lower()
+            if not content_type.startswith(("text/html", "application/xhtml", "text/plain")):
+                raise ValueError(f"unsupported content type {content_type}")
+            html = body.decode(response.encoding or "utf-8", errors="replace")
+            loop = asyncio.get_running_loop()
+            page["text"] = await loop.run_in_executor(self._pool, extract_text, html)
+            page["etag"] = response.headers.get("etag")
+            page["last_modified"] = response.headers.get("last-modified")
+            page["fetched_at"] = time.time()
+        except Exception as e:
+            page["error"] = str(e) or type(e).__name__
+            enrich_fetches.inc("failed")
+            return page, "failed"
+        enrich_fetches.inc("fetched")
+        return page, "fetched"
+
+    async def _get(self, url: str, headers: dict) -> tuple:
+        body = bytearray()
+        async with self.client.stream("GET", url, headers=headers) as response:
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    break
+        return bytes(body[:self.max_bytes]), response
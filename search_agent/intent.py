@@ -0,0 +1,97 @@
+import re
+from dataclasses import dataclass
+
+_ID_SPLIT_RE = re.compile(r"[,\s]+")
+# Job IDs keep the company slug as typed, punctuation included (e.g. `at&t_…`, `mcdonald's_…`);
+# only a trailing `.`, `?` or `!` is read as the end of the sentence
+_ID = r"[^\s,]*[^\s,.?!]"
+
+# Anchored, case-insensitive grammars for the commands the bridge, the agents and the GUI send.
+# Anything that doesn't match one of them in full is left to the LLM.
+_SEARCH_RE = re.compile(
+    r"^\s*(?:please\s+)?(?:find|search(?:\s+for)?|look\s+for)\s+(?:open\s+)?(?:jobs|roles|positions|openings)"
+    r"\s+(?:at|for|in)\s+(?P<companies>[^\n]+?)\s*[.!]?\s*$",
+    re.IGNORECASE,
+)
+_DETAILS_RE = re.compile(
+    r"^\s*(?:get\s+)?(?:(?:job\s+)?details\s+(?:for|of|on)\s+)?job\s+IDs?:?\s+(?P<ids>" + _ID + r"(?:[,\s]+" + _ID + r")*)"
+    r"\s*[.?]?\s*$",
+    re.IGNORECASE,
+)
+_APPLY_BULK_RE = re.compile(
+    r"^\s*apply\s+(?:for|to)\s+job\s+IDs:?\s+(?P<ids>" + _ID + r"(?:[,\s]+" + _ID + r")*?)"
+    r"\s+(?:using|with)\s+(?:resume\s+)?(?P<resume>\S.*?)\s*\.?\s*$",
+    re.IGNORECASE,
+)
+_APPLY_RE = re.compile(
+    r"^\s*apply\s+(?:for|to)\s+job(?:\s+ID)?\s+(?P<id>" + _ID + r")"
+    r"(?:\s+(?:using|with)\s+(?:resume\s+)?(?P<resume>\S.*?))?\s*\.?\s*$",
+    re.IGNORECASE,
+)
+_RANK_RE = re.compile(
+    r"^\s*(?:rank|match)\s+(?:the\s+)?(?:top\s+(?P<top>\d+)\s+)?jobs\s+(?:for|against|using|matching)"
+    r"\s+(?:resume\s+)?(?P<resume>\S.*?\.\w+)\s*\.?\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Intent:
+    """A well-formed command, recognized without the LLM.
+
+    `action` is one of `search`, `search_batch`, `job_details`, `apply`,
+    `apply_bulk` or `rank`; only the fields that action uses are set.
+    """
+
+    action: str
+    companies: tuple = ()
+    job_ids: tuple = ()
+    resume: str = None
+    top_k: int = None
+
+
+def _split_ids(text: str) -> tuple:
+    ids = [j for j in _ID_SPLIT_RE.split(text) if j and j.lower() != "and"]
+    return tuple(dict.fromkeys(ids))
+
+
+def _split_companies(text: str) -> tuple:
+    # Only commas separate companies, so names like "Procter and Gamble" stay whole
+    names = [n.strip(" .") for n in text.split(",")]
+    names = [n[4:] if n.lower().startswith("and ") else n for n in names]
+    return tuple(n.strip() for n in names if n.strip())
+
+
+def parse_intent(text: str):
+    """Parses a message into an Intent, or returns None if it isn't a well-formed command.
+
+    Examples of recognized messages: "Find jobs at Google", "Find jobs at A, B,
+    and C", "Get details for job IDs: a, b", "Apply for job ID x using cv.txt",
+    "Apply for job IDs a, b using cv.txt", "Rank top 10 jobs for resume cv.txt".
+
+    Args:
+        text: The user's message.
+
+    Returns:
+        The Intent, or None when the message needs the LLM to interpret it.
+    """
+    match = _SEARCH_RE.match(text)
+    if match:
+        companies = _split_companies(match.group("companies"))
+        if len(companies) > 1:
+            return Intent("search_batch", companies=companies)
+        return Intent("search", companies=companies) if companies else None
+    match = _DETAILS_RE.match(text)
+    if match:
+        return Intent("job_details", job_ids=_split_ids(match.group("ids")))
+    match = _APPLY_BULK_RE.match(text)
+    if match:
+        return Intent("apply_bulk", job_ids=_split_ids(match.group("ids")), resume=match.group("resume"))
+    match = _APPLY_RE.match(text)
+    if match:
+        return Intent("apply", job_ids=(match.group("id"),), resume=match.group("resume"))
+    match = _RANK_RE.match(text)
+    if match:
+        top = match.group("top")
+        return Intent("rank", resume=match.group("resume"), top_k=int(top) if top else 10)
+    return None
@@ -0,0 +1,84 @@
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from. Exact keys, so posting
+# IDs like "reference" or "sourceId" survive; only the utm_ family matches by prefix
+TRACKING_PARAMS = frozenset({"ref", "src", "source", "trk", "gclid", "fbclid"})
+TRACKING_PREFIXES = ("utm_",)
+
+# Description token overlap above which two same-title postings count as mirrors
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a job URL so the same posting always maps to the same string."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, parts.path.rstrip("/"), query, ""))
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_WORD_RE.findall((title or "").lower()))
+
+
+def normalize_company(company: str) -> str:
+    """Case- and whitespace-insensitive company key, shared by the search cache, re-crawls and watches."""
+    return " ".join((company or "").lower().split())
+
+
+def company_slug(company: str) -> str:
+    return company.lower().replace(" ", "_")
+
+
+def make_job_id(company: str, url: str, title: str) -> str:
+    """Returns a stable ID from the normalized URL (or title when there is no URL).
+
+    The company slug is kept as a readable prefix, e.g. `google_3f2a9c1b7d04`.
+    """
+    key = normalize_url(url) or normalize_title(title)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{company_slug(company)}_{digest}"
+
+
+def fingerprint(company: str, title: str) -> str:
+    """Source-independent key shared by mirrored postings of the same job."""
+    key = f"{(company or '').lower().strip()}|{normalize_title(title)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def is_near_duplicate(a, b, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> bool:
+    """True if two JobRecords with the same fingerprint also describe the same posting."""
+    tokens_a = set(_WORD_RE.findall((a.description or "").lower()))
+    tokens_b = set(_WORD_RE.findall((b.description or "").lower()))
+    if not tokens_a or not tokens_b:
+        return True
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b) >= threshold
+
+
+def collapse_duplicates(jobs: list) -> list:
+    """Drops exact (same ID) and near-duplicate (mirrored) JobRecords, keeping the first seen."""
+    kept = []
+    seen_ids = set()
+    by_fingerprint = {}
+    for job in jobs:
+        if job.id in seen_ids:
+            continue
+        fp = fingerprint(job.company, job.title)
+        if any(is_near_duplicate(job, other) for other in by_fingerprint.get(fp, [])):
+            continue
+        seen_ids.add(job.id)
+        by_fingerprint.setdefault(fp, []).append(job)
+        kept.append(job)
+    return kept
@@ -0,0 +1,52 @@
+import json
+from dataclasses import dataclass
+
+try:
+    # orjson encodes dataclasses natively and is several times faster than json
+    import orjson
+except ImportError:
+    orjson = None
+
+JOB_FIELDS = ("id", "title", "company", "description", "url")
+
+
+@dataclass(frozen=True, slots=True)
+class JobRecord:
+    """One job listing as it moves through search, deduplication and storage.
+
+    Slotted and immutable: a record costs a fraction of the equivalent dict,
+    which matters for the search cache holding thousands of them. Callers
+    outside the search path (A2A parts, HTTP responses) get `as_dict()`.
+    """
+
+    id: str
+    title: str = None
+    company: str = None
+    description: str = None
+    url: str = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobRecord":
+        return cls(*(data.get(field) for field in JOB_FIELDS))
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "title": self.title, "company": self.company,
+                "description": self.description, "url": self.url}
+
+
+def _default(obj):
+    if isinstance(obj, JobRecord):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON encoding of `obj`, which may contain JobRecords, as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def dumps_str(obj) -> str:
+    """Like `dumps`, for callers that need text (ADK tool results)."""
+    return dumps(obj).decode("utf-8")
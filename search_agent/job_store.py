@@ -0,0 +1,692 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+
+from .job_identity import fingerprint, is_near_duplicate, normalize_company
+from .job_record import JOB_FIELDS, JobRecord
+
+# SEARCHJOBS_DATA_DIR relocates all stored state (e.g. for benchmarks)
+DATA_DIR = os.environ.get('SEARCHJOBS_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data'))
+JOBS_DIR = os.path.join(DATA_DIR, 'jobs')
+DB_PATH = os.environ.get('JOBS_DB_PATH', os.path.join(DATA_DIR, 'jobs.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    company TEXT,
+    title TEXT,
+    description TEXT,
+    url TEXT,
+    fingerprint TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS watches (
+    company TEXT PRIMARY KEY,
+    interval REAL NOT NULL,
+    change_rate REAL NOT NULL DEFAULT 1.0,
+    crawls INTEGER NOT NULL DEFAULT 0,
+    last_crawled_at REAL,
+    next_crawl_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_watches_next_crawl_at ON watches(next_crawl_at);
+CREATE TABLE IF NOT EXISTS job_pages (
+    job_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    text TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    status INTEGER,
+    error TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# External-content FTS5 index over jobs, kept in sync by triggers on every write
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE jobs_fts USING fts5(
+    title, description, company,
+    content='jobs', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER jobs_fts_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, description, company)
+    VALUES (new.rowid, new.title, new.description, new.company);
+END;
+CREATE TRIGGER jobs_fts_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+    VALUES ('delete', old.rowid, old.title, old.description, old.company);
+END;
+CREATE TRIGGER jobs_fts_au AFTER UPDATE OF title, description, company ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+    VALUES ('delete', old.rowid, old.title, old.description, old.company);
+    INSERT INTO jobs_fts(rowid, title, description, company)
+    VALUES (new.rowid, new.title, new.description, new.company);
+END;
+INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild');
+"""
+
+# bm25 column weights for title, description, company
+FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+_QUERY_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Number of change events kept for feed consumers that reconnect
+EVENTS_KEEP = int(os.environ.get('JOBS_EVENTS_KEEP', '10000'))
+
+
+def _statements(script: str) -> list:
+    """Splits a SQL script into single statements, keeping trigger bodies whole.
+
+    `executescript` commits any open transaction first, so scripts that must
+    run inside one are executed statement by statement instead.
+    """
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+
+class JobStore:
+    """SQLite-backed store for job listings shared by the agents and the bridge.
+
+    Each thread gets its own connection; the database runs in WAL mode so the
+    bridge can read while the Search Agent writes.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        # Holding the write lock for the whole setup keeps workers that start together from racing the migration
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for statement in _statements(SCHEMA):
+                conn.execute(statement)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "fingerprint" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+            conn.executemany(
+                "UPDATE jobs SET fingerprint = ? WHERE id = ?",
+                [(fingerprint(row[1], row[2]), row[0]) for row in conn.execute("SELECT id, company, title FROM jobs")],
+            )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_fingerprint ON jobs(fingerprint)")
+        if "closed_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN closed_at REAL")
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone()
+        if not has_fts:
+            # Builds the index for jobs stored before full-text search existed
+            for statement in _statements(FTS_SCHEMA):
+                conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Lets queries match company names the way the search cache does ("Acme" == " acme ")
+            conn.create_function("normalize_company", 1, normalize_company, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> dict:
+        return {field: row[field] for field in JOB_FIELDS}
+
+    def upsert_jobs(self, jobs: list) -> int:
+        """Inserts new jobs and updates changed ones in a single transaction.
+
+        Jobs identical to the stored record are skipped: they cause no write,
+        no `updated_at` bump and no change event. A closed job that shows up
+        again is reopened.
+
+        Args:
+            jobs: JobRecords.
+
+        Returns:
+            The number of jobs written.
+        """
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            # Take the write lock before reading, so another process can't change the rows in between
+            conn.execute("BEGIN IMMEDIATE")
+            closed = set()
+            existing = self._existing_jobs(conn, [job.id for job in jobs], closed=closed)
+            changed = []
+            for job in {job.id: job for job in jobs}.values():
+                fields = job.as_dict()
+                if existing.get(job.id) != fields or job.id in closed:
+                    changed.append(fields)
+            if not changed:
+                return 0
+            conn.executemany(
+                """
+                INSERT INTO jobs (id, company, title, description, url, fingerprint, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    company = excluded.company,
+                    title = excluded.title,
+                    description = excluded.description,
+                    url = excluded.url,
+                    fingerprint = excluded.fingerprint,
+                    updated_at = excluded.updated_at,
+                    closed_at = NULL
+                """,
+                [
+                    (job["id"], job["company"], job["title"], job["description"], job["url"],
+                     fingerprint(job["company"], job["title"]), now, now)
+                    for job in changed
+                ],
+            )
+            self._add_events(conn, [
+                ("job", {"action": self._change_action(job["id"], existing, closed), "job": job})
+                for job in changed
+            ])
+        return len(changed)
+
+    @staticmethod
+    def _change_action(job_id: str, existing: dict, closed: set) -> str:
+        if job_id in closed:
+            return "reopened"
+        return "updated" if job_id in existing else "added"
+
+    def upsert_job(self, job: JobRecord) -> None:
+        self.upsert_jobs([job])
+
+    def resolve_duplicates(self, jobs: list) -> list:
+        """Maps new jobs that mirror an already stored posting onto the stored record.
+
+        A job whose ID is unknown but whose fingerprint (company + normalized
+        title) matches a stored near-duplicate is replaced by that stored job,
+        so mirrored postings from other sources don't create new records. A
+        known job keeps its stored company name: IDs ignore letter case, so a
+        search for "Acme" must not rewrite the "ACME" jobs a watch crawled.
+
+        Args:
+            jobs: JobRecords as produced by a search.
+
+        Returns:
+            The records with mirrors replaced by their stored originals, deduplicated by ID.
+        """
+        conn = self._conn()
+        existing = self._existing_jobs(conn, [job.id for job in jobs])
+        resolved = {}
+        for job in jobs:
+            if job.id in existing:
+                job = replace(job, company=existing[job.id]["company"])
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE fingerprint = ? AND id != ?",
+                    (fingerprint(job.company, job.title), job.id),
+                ).fetchall()
+                for row in rows:
+                    stored = JobRecord(*(row[field] for field in JOB_FIELDS))
+                    if is_near_duplicate(job, stored):
+                        job = stored
+                        break
+            resolved.setdefault(job.id, job)
+        return list(resolved.values())
+
+    def _existing_jobs(self, conn: sqlite3.Connection, ids: list, closed: set = None) -> dict:
+        existing = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = list(ids[start:start + 500])
+            placeholders = ", ".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", chunk):
+                existing[row["id"]] = self._row_to_job(row)
+                if closed is not None and row["closed_at"] is not None:
+                    closed.add(row["id"])
+        return existing
+
+    def close_missing(self, company: str, seen_ids: list) -> int:
+        """Marks the company's open jobs that are not in `seen_ids` as closed.
+
+        Company names match case- and whitespace-insensitively, like searches.
+
+        Closed jobs stay in the store and keep their ID, so an application
+        history still resolves; `upsert_jobs` reopens them if they come back.
+
+        Args:
+            company: Company whose listings were just re-crawled.
+            seen_ids: IDs of the jobs the crawl returned.
+
+        Returns:
+            The number of jobs closed.
+        """
+        now = time.time()
+        seen = set(seen_ids)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE normalize_company(company) = ? AND closed_at IS NULL",
+                (normalize_company(company),),
+            ).fetchall()
+            gone = [self._row_to_job(row) for row in rows if row["id"] not in seen]
+            if not gone:
+                return 0
+            conn.executemany(
+                "UPDATE jobs SET closed_at = ?, updated_at = ? WHERE id = ?",
+                [(now, now, job["id"]) for job in gone],
+            )
+            self._add_events(conn, [("job", {"action": "closed", "job": job}) for job in gone])
+        return len(gone)
+
+    def get_pages(self, job_ids: list) -> dict:
+        """Returns `{job_id: page}` for the fetched job pages among `job_ids`.
+
+        A page is a dict with the `url`, the extracted `text`, the `etag` and
+        `last_modified` validators, the last HTTP `status` or fetch `error`,
+        and `fetched_at`.
+        """
+        conn = self._conn()
+        pages = {}
+        for start in range(0, len(job_ids), 500):
+            chunk = list(job_ids[start:start + 500])
+            placeholders = ", ".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT * FROM job_pages WHERE job_id IN ({placeholders})", chunk):
+                pages[row["job_id"]] = dict(row)
+        return pages
+
+    def save_pages(self, pages: list) -> int:
+        """Stores fetched job pages in one transaction.
+
+        A `job_page` change event is recorded for each page whose text
+        changed, so readers such as the ranker can pick up the fuller text.
+
+        Args:
+            pages: Page dicts as returned by `get_pages`.
+
+        Returns:
+            The number of pages whose text changed.
+        """
+        if not pages:
+            return 0
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = {}
+            for start in range(0, len(pages), 500):
+                chunk = [page["job_id"] for page in pages[start:start + 500]]
+                placeholders = ", ".join("?" * len(chunk))
+                old.update(conn.execute(
+                    f"SELECT job_id, text FROM job_pages WHERE job_id IN ({placeholders})", chunk
+                ).fetchall())
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO job_pages (job_id, url, text, etag, last_modified, status, error, fetched_at)
+                VALUES (:job_id, :url, :text, :etag, :last_modified, :status, :error, :fetched_at)
+                """,
+                pages,
+            )
+            changed = [page for page in pages if page["text"] and page["text"] != old.get(page["job_id"])]
+            self._add_events(conn, [("job_page", {"job_id": page["job_id"]}) for page in changed])
+        return len(changed)
+
+    @staticmethod
+    def _add_events(conn: sqlite3.Connection, events: list) -> None:
+        if not events:
+            return
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO events (type, payload, created_at) VALUES (?, ?, ?)",
+            [(event_type, json.dumps(payload), now) for event_type, payload in events],
+        )
+        last_seq = conn.execute("SELECT MAX(seq) FROM events").fetchone()[0]
+        conn.execute("DELETE FROM events WHERE seq <= ?", (last_seq - EVENTS_KEEP,))
+
+    def add_event(self, event_type: str, payload: dict) -> None:
+        """Records a change event for the bridge's live feed.
+
+        Args:
+            event_type: Event name, e.g. `job` or `application`.
+            payload: JSON-serializable event data.
+        """
+        conn = self._conn()
+        with conn:
+            self._add_events(conn, [(event_type, payload)])
+
+    def events_after(self, seq: int, limit: int = 1000) -> list:
+        """Returns up to `limit` events newer than `seq` as `(seq, type, payload_json)` tuples."""
+        return self._conn().execute(
+            "SELECT seq, type, payload FROM events WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit)
+        ).fetchall()
+
+    def last_event_seq(self) -> int:
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def get_job(self, job_id: str):
+        """Returns the job dict for `job_id`, or None if it is not stored."""
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_jobs(self, job_ids: list) -> dict:
+        """Returns a `{job_id: job}` dict for the stored jobs among `job_ids`."""
+        return self._existing_jobs(self._conn(), job_ids)
+
+    def list_page(self, company: str = None, since: float = None, after: int = None,
+                  limit: int = None, fields: tuple = JOB_FIELDS, status: str = None) -> tuple:
+        """Returns one page of stored jobs in insertion order.
+
+        Args:
+            company: Only return jobs for this company, in any letter case.
+            since: Only return jobs added or updated after this UNIX timestamp.
+            after: Pagination cursor returned by a previous page.
+            limit: Maximum number of jobs to return; None returns all of them.
+            fields: Job fields to include in each result.
+            status: `open` or `closed` to return only those jobs; None returns both.
+
+        Returns:
+            A `(jobs, next_cursor)` tuple; `next_cursor` is None on the last page.
+        """
+        columns = [f for f in fields if f in JOB_FIELDS] or ["id"]
+        where, params = self._page_filter(company, since, after, status)
+        sql = f"SELECT rowid, {', '.join(columns)} FROM jobs{where} ORDER BY rowid"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self._conn().execute(sql, params).fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]["rowid"]
+        return [{c: row[c] for c in columns} for row in rows], next_cursor
+
+    @staticmethod
+    def _page_filter(company: str, since: float, after: int, status: str = None) -> tuple:
+        clauses, params = [], []
+        if status == "open":
+            clauses.append("closed_at IS NULL")
+        elif status == "closed":
+            clauses.append("closed_at IS NOT NULL")
+        if company:
+            clauses.append("normalize_company(company) = ?")
+            params.append(normalize_company(company))
+        if since is not None:
+            clauses.append("updated_at > ?")
+            params.append(since)
+        if after is not None:
+            clauses.append("rowid > ?")
+            params.append(after)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def page_cursor(self, company: str = None, since: float = None, after: int = None, limit: int = None,
+                    status: str = None):
+        """Returns the `next_cursor` that `list_page` would return, without fetching the page."""
+        if limit is None:
+            return None
+        where, params = self._page_filter(company, since, after, status)
+        rows = self._conn().execute(
+            f"SELECT rowid FROM jobs{where} ORDER BY rowid LIMIT 2 OFFSET ?", (*params, limit - 1)
+        ).fetchall()
+        return rows[0][0] if len(rows) == 2 else None
+
+    def iter_pages(self, company: str = None, since: float = None, after: int = None,
+                   limit: int = None, fields: tuple = JOB_FIELDS, status: str = None, page_size: int = 500):
+        """Yields the jobs `list_page` would return as successive lists of at most `page_size`.
+
+        Each list is a separate keyset query on the calling thread's
+        connection, so only one page is in memory at a time and a consumer
+        may resume the generator from a different thread.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            jobs, after = self.list_page(company=company, since=since, after=after, limit=size, fields=fields,
+                                         status=status)
+            if jobs:
+                yield jobs
+            if after is None:
+                return
+            if remaining is not None:
+                remaining -= len(jobs)
+
+    def list_jobs(self, company: str = None) -> list:
+        """Returns all stored jobs in insertion order, optionally for one company."""
+        jobs, _ = self.list_page(company=company)
+        return jobs
+
+    def search(self, query: str, company: str = None, offset: int = 0, limit: int = 20) -> tuple:
+        """Ranked full-text search over job title, description and company.
+
+        Every word in `query` must match (the last one as a prefix, for
+        search-as-you-type); results are ordered by BM25 relevance.
+
+        Args:
+            query: Free-text keywords.
+            company: Only return jobs for this company, in any letter case.
+            offset: Number of ranked results to skip.
+            limit: Maximum number of results to return.
+
+        Returns:
+            A `(jobs, next_offset)` tuple; each job carries a `score` (higher is
+            more relevant) and `next_offset` is None on the last page.
+        """
+        tokens = _QUERY_TOKEN_RE.findall(query)
+        if not tokens:
+            return [], None
+        match = " ".join(f'"{t}"' for t in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        sql = (
+            f"SELECT jobs.*, bm25(jobs_fts, {', '.join(map(str, FTS_WEIGHTS))}) AS score "
+            "FROM jobs_fts JOIN jobs ON jobs.rowid = jobs_fts.rowid WHERE jobs_fts MATCH ?"
+        )
+        params = [match]
+        if company:
+            sql += " AND normalize_company(jobs.company) = ?"
+            params.append(normalize_company(company))
+        sql += " ORDER BY score LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+        rows = self._conn().execute(sql, params).fetchall()
+        next_offset = offset + limit if len(rows) > limit else None
+        jobs = []
+        for row in rows[:limit]:
+            job = self._row_to_job(row)
+            # bm25() is lower-is-better; flip it so API consumers see higher-is-better
+            job["score"] = round(-row["score"], 4)
+            jobs.append(job)
+        return jobs, next_offset
+
+    def add_watch(self, company: str, interval: float) -> dict:
+        """Adds a company to the re-crawl watch list, due immediately.
+
+        Re-adding a watched company, in any letter case, resets its interval
+        and keeps its schedule.
+
+        Args:
+            company: Company name, as passed to `search_jobs`.
+            interval: Seconds between re-crawls until the change rate adjusts it.
+
+        Returns:
+            The watch entry.
+        """
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # "acme" re-uses an "Acme" watch instead of crawling the same company twice
+            updated = conn.execute(
+                "UPDATE watches SET interval = ? WHERE normalize_company(company) = ?",
+                (interval, normalize_company(company)),
+            ).rowcount
+            if not updated:
+                conn.execute(
+                    "INSERT INTO watches (company, interval, next_crawl_at, created_at) VALUES (?, ?, ?, ?)",
+                    (company, interval, now, now),
+                )
+        return self.get_watch(company)
+
+    def remove_watch(self, company: str) -> bool:
+        """Removes a company from the watch list; returns False if it wasn't watched."""
+        conn = self._conn()
+        with conn:
+            return conn.execute(
+                "DELETE FROM watches WHERE normalize_company(company) = ?", (normalize_company(company),)
+            ).rowcount > 0
+
+    def get_watch(self, company: str):
+        row = self._conn().execute(
+            "SELECT * FROM watches WHERE normalize_company(company) = ?", (normalize_company(company),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_watches(self) -> list:
+        """Returns every watch entry, the next one due first."""
+        return [dict(row) for row in self._conn().execute("SELECT * FROM watches ORDER BY next_crawl_at")]
+
+    def watch_queue(self, now: float = None) -> dict:
+        """Returns `{"watched", "due", "next_due_at"}` for the re-crawl queue."""
+        now = time.time() if now is None else now
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(next_crawl_at <= ?), 0), MIN(next_crawl_at) FROM watches", (now,)
+        ).fetchone()
+        return {"watched": row[0], "due": row[1], "next_due_at": row[2]}
+
+    def claim_watch(self, lease: float, now: float = None):
+        """Takes the most urgent due watch entry off the queue.
+
+        Urgency is staleness (time since the last crawl) weighted by the
+        observed change rate, so companies that post often are refreshed
+        first. The entry's next crawl moves `lease` seconds ahead, so other
+        workers skip it while this one crawls.
+
+        Args:
+            lease: Seconds the claim holds if the crawl never finishes.
+            now: Current UNIX time (for tests).
+
+        Returns:
+            The claimed watch entry, or None if nothing is due.
+        """
+        now = time.time() if now is None else now
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT * FROM watches WHERE next_crawl_at <= ?
+                ORDER BY (? - COALESCE(last_crawled_at, 0)) * (1 + change_rate) DESC LIMIT 1
+                """,
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE watches SET next_crawl_at = ? WHERE company = ?", (now + lease, row["company"]))
+        return dict(row)
+
+    def finish_watch(self, company: str, next_crawl_at: float, interval: float, change_rate: float,
+                     error: str = None) -> None:
+        """Records a finished re-crawl and schedules the next one."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """
+                UPDATE watches SET next_crawl_at = ?, interval = ?, change_rate = ?, last_error = ?,
+                    last_crawled_at = ?, crawls = crawls + 1
+                WHERE company = ?
+                """,
+                (next_crawl_at, interval, change_rate, error, time.time(), company),
+            )
+
+    def version(self) -> tuple:
+        """Returns `(count, last_updated_at)`, a cheap validator for the whole store."""
+        row = self._conn().execute("SELECT COUNT(*), MAX(updated_at) FROM jobs").fetchone()
+        return row[0], row[1] or 0.0
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def import_json_dir(self, jobs_dir: str = JOBS_DIR, force: bool = False) -> int:
+        """One-shot import of legacy `data/jobs/*.json` files into the store.
+
+        The import is recorded in the `meta` table so it only runs once unless
+        `force` is set.
+
+        Args:
+            jobs_dir: Directory holding the legacy per-job JSON files.
+            force: Re-import even if an import has already been recorded.
+
+        Returns:
+            The number of jobs imported.
+        """
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = 'json_import_done'").fetchone()
+        if done and not force:
+            return 0
+        jobs = []
+        if os.path.isdir(jobs_dir):
+            for name in sorted(os.listdir(jobs_dir)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(jobs_dir, name), "r") as f:
+                        job = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(job, dict) and job.get("id"):
+                    jobs.append(JobRecord.from_dict(job))
+        if jobs:
+            self.upsert_jobs(jobs)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_import_done', ?)",
+                (str(time.time()),),
+            )
+        return len(jobs)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> JobStore:
+    """Returns the process-wide JobStore, importing legacy JSON files on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = JobStore()
+                imported = store.import_json_dir()
+                if imported:
+                    print(f"Imported {imported} legacy job files into {store.db_path}.")
+                _store = store
+    return _store
+
+
+if __name__ == "__main__":
+    # One-shot importer: python -m search_agent.job_store
+    store = JobStore()
+    count = store.import_json_dir(force=True)
+    print(f"Imported {count} jobs from {JOBS_DIR} into {store.db_path} ({store.count()} total).")
@@ -0,0 +1,214 @@
+import asyncio
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from .telemetry import counter, stage
+
+# Messages the intent parser can't handle go to the ADK Runner only when this is "1"
+LLM_ENABLED = os.environ.get('LLM_ENABLED', '0') == '1'
+# Gemini model name, or "stub" for the deterministic offline model in search_agent.stub_llm
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.5-flash-lite')
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '4'))
+# Tokens (prompt + output) the agent may spend per LLM_BUDGET_WINDOW seconds (0 = unlimited)
+LLM_TOKEN_BUDGET = int(os.environ.get('LLM_TOKEN_BUDGET', '200000'))
+LLM_BUDGET_WINDOW = float(os.environ.get('LLM_BUDGET_WINDOW', '60'))
+LLM_MAX_OUTPUT_TOKENS = int(os.environ.get('LLM_MAX_OUTPUT_TOKENS', '1024'))
+LLM_CACHE_SIZE = int(os.environ.get('LLM_CACHE_SIZE', '512'))
+LLM_CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', '600'))
+
+# Tools a cached plan may call again; a plan using any other tool (e.g. an apply) is never cached
+REPLAYABLE_TOOLS = frozenset({
+    "search_jobs", "search_jobs_batch", "get_job_details", "get_jobs_details",
+    "get_job_details_from_search_agent", "read_resume", "rank_jobs_for_resume",
+})
+
+llm_requests = counter("llm_requests_total", "LLM fallback requests by outcome.", ("agent", "result"))
+llm_tokens = counter("llm_tokens_total", "Tokens spent on LLM calls.", ("agent",))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when the token budget for the current window is used up."""
+
+
+class TokenBudget:
+    """Sliding-window cap on the tokens spent on LLM calls.
+
+    A call is admitted while the window still has tokens left; what it
+    actually spent is only known afterwards, so one call can overshoot
+    the limit and the next ones wait until the window slides past it.
+    """
+
+    def __init__(self, limit: int = LLM_TOKEN_BUDGET, window: float = LLM_BUDGET_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._spent = deque()  # (timestamp, tokens)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._spent and self._spent[0][0] <= now - self.window:
+            self._total -= self._spent.popleft()[1]
+
+    def remaining(self) -> float:
+        if not self.limit:
+            return float("inf")
+        with self._lock:
+            self._expire(time.monotonic())
+            return self.limit - self._total
+
+    def check(self):
+        """Raises BudgetExceeded if no tokens are left in the current window."""
+        if self.remaining() <= 0:
+            raise BudgetExceeded(
+                f"LLM token budget of {self.limit} tokens per {self.window:.0f}s is used up; try again shortly."
+            )
+
+    def spend(self, tokens: int):
+        if not self.limit or not tokens:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._spent.append((now, tokens))
+            self._total += tokens
+
+
+@dataclass(slots=True)
+class LlmReply:
+    """What the LLM path produced for one message.
+
+    `tool_calls` is the model's tool plan as `(name, args)` pairs; `cached`
+    marks replies served from the cache without a model call.
+    """
+
+    text: str
+    tool_calls: tuple = ()
+    tokens: int = 0
+    cached: bool = False
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def create_model(name: str = LLM_MODEL):
+    """Returns the model for an ADK Agent: the Gemini model name, or a StubLlm for `stub`."""
+    if name == "stub":
+        from .stub_llm import StubLlm
+        return StubLlm.load()
+    return name
+
+
+def generate_config():
+    """Generation settings shared by the agents; caps each answer at LLM_MAX_OUTPUT_TOKENS."""
+    from google.genai import types
+    return types.GenerateContentConfig(max_output_tokens=LLM_MAX_OUTPUT_TOKENS)
+
+
+class LlmGateway:
+    """Runs messages through an agent's ADK Runner behind a cache and budgets.
+
+    Replies are cached by normalized prompt. A cached text answer is returned
+    as is. A cached tool plan is replayed by calling the same tools with the
+    same arguments, so the data stays fresh without another model call; the
+    reply is the model's cached answer followed by each tool's new output.
+    Only read-only plans (REPLAYABLE_TOOLS) are cached: anything with a side
+    effect, such as applying for a job, always goes to the model. Model calls
+    are limited to `max_concurrency` at a time and to the token budget.
+    """
+
+    def __init__(self, agent_name: str, runner_provider, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 budget: TokenBudget = None, cache_size: int = LLM_CACHE_SIZE, ttl: float = LLM_CACHE_TTL):
+        self.agent_name = agent_name
+        self._runner_provider = runner_provider
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.budget = budget or TokenBudget()
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self._cache = OrderedDict()  # normalized prompt -> (expires_at, LlmReply)
+
+    def _cached(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _remember(self, key: str, reply: LlmReply):
+        self._cache[key] = (time.monotonic() + self.ttl, reply)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def ask(self, text: str, session_id: str, user_id: str = "a2a", cacheable: bool = True) -> LlmReply:
+        """Answers a message the intent parser could not handle.
+
+        Args:
+            text: The user's message.
+            session_id: ADK session to run in (the A2A context ID).
+            user_id: ADK user the session belongs to.
+            cacheable: False for follow-ups whose meaning depends on the conversation.
+
+        Returns:
+            The reply, possibly from the cache.
+
+        Raises:
+            BudgetExceeded: If the token budget is used up.
+        """
+        key = normalize_prompt(text)
+        cached = self._cached(key) if cacheable and self.cache_size else None
+        if cached is not None:
+            llm_requests.inc(self.agent_name, "cached")
+            if cached.tool_calls:
+                return LlmReply(await self._replay(cached), cached.tool_calls, 0, True)
+            return LlmReply(cached.text, (), 0, True)
+
+        try:
+            self.budget.check()
+        except BudgetExceeded:
+            llm_requests.inc(self.agent_name, "over_budget")
+            raise
+        async with self._semaphore:
+            with stage("llm.run", agent=self.agent_name):
+                reply = await self._run(text, session_id, user_id)
+        self.budget.spend(reply.tokens)
+        llm_tokens.inc(self.agent_name, amount=reply.tokens)
+        llm_requests.inc(self.agent_name, "model")
+        if cacheable and self.cache_size and all(name in REPLAYABLE_TOOLS for name, _ in reply.tool_calls):
+            self._remember(key, reply)
+        return reply
+
+    async def _run(self, text: str, session_id: str, user_id: str) -> LlmReply:
+        from google.genai import types
+
+        runner = self._runner_provider()
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        texts, tool_calls, tokens = [], [], 0
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if event.usage_metadata and event.usage_metadata.total_token_count:
+                tokens += event.usage_metadata.total_token_count
+            for call in event.get_function_calls():
+                tool_calls.append((call.name, dict(call.args or {})))
+            if event.is_final_response() and event.content and event.content.parts:
+                texts.extend(part.text for part in event.content.parts if part.text)
+        return LlmReply("".join(texts).strip(), tuple(tool_calls), tokens)
+
+    async def _replay(self, reply: LlmReply) -> str:
+        tools = {getattr(tool, "__name__", None): tool for tool in self._runner_provider().agent.tools}
+        sections = [reply.text] if reply.text else []
+        for name, args in reply.tool_calls:
+            tool = tools.get(name)
+            # Only read-only plans are cached, but a replay must never apply for anything regardless
+            if tool is None or name not in REPLAYABLE_TOOLS:
+                continue
+            if inspect.iscoroutinefunction(tool):
+                result = await tool(**args)
+            else:
+                result = await asyncio.to_thread(tool, **args)
+            sections.append(f"Latest {name} result:\n{result}")
+        return "\n\n".join(sections)
@@ -0,0 +1,111 @@
+import asyncio
+import contextvars
+import os
+import random
+import time
+
+from .job_store import get_store
+from .search_backends import RateLimiter
+from .startup import worker_count
+from .telemetry import counter, stage
+
+# Set to "0" to stop the Search Agent from re-crawling watched companies
+RECRAWL_ENABLED = os.environ.get('RECRAWL_ENABLED', '1') == '1'
+# Starting interval for a newly watched company, in seconds; the change rate then moves it
+RECRAWL_INTERVAL = float(os.environ.get('RECRAWL_INTERVAL', str(6 * 3600)))
+RECRAWL_MIN_INTERVAL = float(os.environ.get('RECRAWL_MIN_INTERVAL', '3600'))
+RECRAWL_MAX_INTERVAL = float(os.environ.get('RECRAWL_MAX_INTERVAL', str(7 * 24 * 3600)))
+# Each next crawl is moved by up to this fraction of its interval, so watches added together spread out
+RECRAWL_JITTER = float(os.environ.get('RECRAWL_JITTER', '0.1'))
+# Re-crawls per minute across all Search Agent workers (0 = unlimited)
+RECRAWL_RATE = float(os.environ.get('RECRAWL_RATE', '6'))
+# Longest the scheduler sleeps before checking the watch list again
+RECRAWL_POLL = float(os.environ.get('RECRAWL_POLL', '30'))
+
+recrawls = counter("recrawl_total", "Scheduled re-crawls by outcome.", ("result",))
+
+# Weight of the latest crawl in a company's change rate (exponential moving average)
+_CHANGE_RATE_ALPHA = 0.3
+
+
+def next_interval(interval: float, changed: bool, min_interval: float = RECRAWL_MIN_INTERVAL,
+                  max_interval: float = RECRAWL_MAX_INTERVAL) -> float:
+    """Halves the interval after a crawl that found changes and grows it by half after one that didn't."""
+    interval = interval / 2 if changed else interval * 1.5
+    return min(max(interval, min_interval), max_interval)
+
+
+class RecrawlScheduler:
+    """Keeps watched companies fresh by re-running their search in the background.
+
+    The watch list lives in the job store, so the bridge can edit it and
+    every Search Agent worker shares one queue: a worker claims the most
+    urgent due company, re-crawls it with `refresh_jobs` and schedules the
+    next crawl from the outcome. Companies whose listings change get
+    re-crawled more often, quiet ones less, within the configured bounds.
+    With an `enricher`, the company's job pages are refreshed after the
+    crawl once they are older than its `max_age`.
+    """
+
+    def __init__(self, rate: float = RECRAWL_RATE, jitter: float = RECRAWL_JITTER, poll: float = RECRAWL_POLL,
+                 enricher=None):
+        # The rate is per minute and shared by the workers, like SEARCH_RATE_LIMIT
+        self.rate_limiter = RateLimiter(rate / 60 / worker_count())
+        self.jitter = jitter
+        self.poll = poll
+        self.enricher = enricher
+
+    async def run(self):
+        """Runs until cancelled, crawling one due company at a time."""
+        store = get_store()
+        while True:
+            try:
+                crawled = await self.run_once()
+            except Exception as e:
+                print(f"Re-crawl scheduler error: {e}")
+                crawled = False
+            if crawled:
+                continue
+            queue = await asyncio.to_thread(store.watch_queue)
+            wait = self.poll
+            if queue["next_due_at"] is not None:
+                wait = min(max(queue["next_due_at"] - time.time(), 0.1), self.poll)
+            await asyncio.sleep(wait)
+
+    async def run_once(self) -> bool:
+        """Re-crawls the most urgent due company, if any; returns whether one was crawled."""
+        from .search_tools import refresh_jobs
+
+        store = get_store()
+        # The lease outlasts any crawl and the rate wait; a worker that dies mid-crawl frees the entry when it runs out
+        watch = await asyncio.to_thread(store.claim_watch, RECRAWL_MIN_INTERVAL)
+        if watch is None:
+            return False
+        # Only a claimed crawl spends a rate slot, so idle polls leave the budget alone
+        await self.rate_limiter.acquire_async()
+        company = watch["company"]
+        error = None
+        changed = False
+        try:
+            with stage("recrawl.crawl", company=company):
+                result = await asyncio.to_thread(contextvars.copy_context().run, refresh_jobs, company)
+            changed = bool(result["changed"] or result["closed"])
+            recrawls.inc("changed" if changed else "unchanged")
+        except Exception as e:
+            error = str(e)
+            recrawls.inc("error")
+            print(f"Re-crawl of {company} failed: {e}")
+        # A failed crawl keeps its interval and rate and is simply retried one interval later
+        interval = watch["interval"] if error else next_interval(watch["interval"], changed)
+        change_rate = watch["change_rate"]
+        if not error:
+            change_rate += _CHANGE_RATE_ALPHA * (float(changed) - change_rate)
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        await asyncio.to_thread(store.finish_watch, company, time.time() + delay, interval, change_rate, error)
+        if self.enricher is not None and not error:
+            # Pages fetched within ENRICH_MAX_AGE are skipped; older ones get a conditional request
+            try:
+                await self.enricher.enrich(result["jobs"])
+            except Exception as e:
+                print(f"Job page enrichment for {company} failed: {e}")
+        return True
@@ -0,0 +1,302 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .job_identity import normalize_title, normalize_url
+from .startup import worker_count
+from .telemetry import stage
+
+# Backend spec: "ddgs", "stub", "replay", or "fanout:<spec>,<spec>,..."
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'ddgs')
+# Upstream searches per second for the DDGS backend (0 = unlimited)
+SEARCH_RATE_LIMIT = float(os.environ.get('SEARCH_RATE_LIMIT', '1'))
+SEARCH_BACKEND_TIMEOUT = float(os.environ.get('SEARCH_BACKEND_TIMEOUT', '20'))
+SEARCH_STUB_LATENCY = float(os.environ.get('SEARCH_STUB_LATENCY', '0'))
+# Base URL of the stub's job links; point it at `python -m search_agent.stub_pages` to exercise enrichment offline
+SEARCH_STUB_URL = os.environ.get('SEARCH_STUB_URL', 'https://jobs.example.com')
+SEARCH_REPLAY_PATH = os.environ.get('SEARCH_REPLAY_PATH', '')
+# Backend spec whose results are recorded into the replay file on a miss (empty = replay only)
+SEARCH_RECORD_FROM = os.environ.get('SEARCH_RECORD_FROM', '')
+
+STUB_ROLES = ("Software Engineer", "Data Scientist", "Product Manager", "Site Reliability Engineer",
+              "Designer", "Technical Writer", "Security Engineer", "Data Engineer")
+
+
+class RateLimiter:
+    """Spaces calls at least `1 / rate` seconds apart across all threads and event loops."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claims the next slot and returns how long the caller must wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        return start - now
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def run_sync(coro):
+    """Runs a coroutine from synchronous code, even if this thread already runs an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class SearchBackend:
+    """Base class for job search sources.
+
+    Subclasses implement `_search`, returning DDGS-style result dicts with
+    `title`, `body` and `href` keys. `search` applies the backend's own rate
+    limit and timeout around it.
+    """
+
+    name = "base"
+
+    def __init__(self, rate_limit: float = 0.0, timeout: float = SEARCH_BACKEND_TIMEOUT):
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.timeout = timeout
+
+    async def _search(self, company_name: str, max_results: int) -> list:
+        raise NotImplementedError
+
+    async def search(self, company_name: str, max_results: int = 10) -> list:
+        """Returns up to `max_results` job results for the company.
+
+        Raises:
+            asyncio.TimeoutError: If the backend does not answer within its timeout.
+        """
+        await self.rate_limiter.acquire_async()
+        with stage(f"search.backend.{self.name}", company=company_name):
+            return await asyncio.wait_for(self._search(company_name, max_results), self.timeout)
+
+    def search_sync(self, company_name: str, max_results: int = 10) -> list:
+        return run_sync(self.search(company_name, max_results))
+
+    async def stream(self, company_name: str, max_results: int = 10):
+        """Yields lists of results as they arrive; single-source backends yield once."""
+        yield await self.search(company_name, max_results)
+
+
+class DDGSBackend(SearchBackend):
+    """DuckDuckGo web search (the `ddgs` package), run in a worker thread."""
+
+    name = "ddgs"
+
+    def __init__(self, rate_limit: float = None, timeout: float = SEARCH_BACKEND_TIMEOUT):
+        if rate_limit is None:
+            # SEARCH_RATE_LIMIT is for the whole server, so each worker process takes its share
+            rate_limit = SEARCH_RATE_LIMIT / worker_count()
+        super().__init__(rate_limit, timeout)
+
+    async def _search(self, company_name: str, max_results: int) -> list:
+        return await asyncio.to_thread(self._search_blocking, company_name, max_results)
+
+    @staticmethod
+    def _search_blocking(company_name: str, max_results: int) -> list:
+        from ddgs import DDGS
+        with DDGS() as ddgs:
+            # simple search query
+            query = f"{company_name} careers jobs"
+            # DDGS has no dedicated jobs search; a text search is good enough to find *links* to jobs.
+            search_results = list(ddgs.text(query, max_results=max_results))
+            print(f"DDGS returned {len(search_results)} results.")
+
+            if not search_results:
+                print("No results found or error in retrieval. Using MOCK data.")
+                # Fallback to mock data for demonstration
+                search_results = [
+                    {'title': f'{company_name} Software Engineer', 'body': 'Job description placeholder...', 'href': 'http://example.com/job1'},
+                    {'title': f'{company_name} Data Scientist', 'body': 'Job description placeholder...', 'href': 'http://example.com/job2'},
+                ]
+        return search_results
+
+
+class StubBackend(SearchBackend):
+    """Deterministic offline results with optional simulated latency (benchmarks, tests)."""
+
+    name = "stub"
+
+    def __init__(self, latency: float = SEARCH_STUB_LATENCY, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    async def _search(self, company_name: str, max_results: int) -> list:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        slug = company_name.lower().replace(' ', '-')
+        return [
+            {
+                'title': f'{company_name} {role}',
+                'body': f'{company_name} is hiring a {role} to work on {slug} products. Requirements: python, cloud, teamwork.',
+                'href': f'{SEARCH_STUB_URL}/{slug}/{i}',
+            }
+            for i, role in enumerate(STUB_ROLES)
+        ][:max_results]
+
+
+class ReplayBackend(SearchBackend):
+    """Serves results recorded in a JSON fixture file keyed by normalized company name.
+
+    With a `record_from` backend, misses are fetched from it and appended to
+    the fixture, so a live run can be captured once and replayed offline.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, record_from: SearchBackend = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.record_from = record_from
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self._fixtures = json.load(f)
+        except FileNotFoundError:
+            self._fixtures = {}
+
+    @staticmethod
+    def _key(company_name: str) -> str:
+        return " ".join(company_name.lower().split())
+
+    async def _search(self, company_name: str, max_results: int) -> list:
+        key = self._key(company_name)
+        results = self._fixtures.get(key)
+        if results is None and self.record_from is not None:
+            results = await self.record_from.search(company_name, max_results)
+            with self._lock:
+                self._fixtures[key] = results
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._fixtures, f, indent=2)
+                os.replace(tmp_path, self.path)
+        return (results or [])[:max_results]
+
+
+class FanOutBackend(SearchBackend):
+    """Queries several backends concurrently and merges their results.
+
+    Results are interleaved across sources and deduplicated by normalized URL.
+    Sources that fail, or are still running when the fan-out timeout expires,
+    are skipped, so one slow source can't hold up the others.
+    """
+
+    name = "fanout"
+
+    def __init__(self, backends: list, **kwargs):
+        super().__init__(**kwargs)
+        self.backends = backends
+
+    async def search(self, company_name: str, max_results: int = 10) -> list:
+        # No outer wait_for: the deadline is applied per source in _search
+        await self.rate_limiter.acquire_async()
+        with stage(f"search.backend.{self.name}", company=company_name):
+            return await self._search(company_name, max_results)
+
+    async def _search(self, company_name: str, max_results: int) -> list:
+        tasks = [asyncio.ensure_future(b.search(company_name, max_results)) for b in self.backends]
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+        per_source = []
+        for backend, task in zip(self.backends, tasks):
+            if task in done and task.exception() is None:
+                per_source.append(task.result())
+            elif task in done:
+                print(f"Search backend {backend.name} failed: {task.exception()}")
+        merged, seen = [], set()
+        for rank in range(max((len(r) for r in per_source), default=0)):
+            for results in per_source:
+                if rank >= len(results):
+                    continue
+                res = results[rank]
+                # Mirrors with different URLs are collapsed later by job_identity.collapse_duplicates
+                key = normalize_url(res.get("href")) or normalize_title(res.get("title"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(res)
+        return merged[:max_results]
+
+    async def stream(self, company_name: str, max_results: int = 10):
+        """Yields each source's new (not yet seen) results as soon as that source answers."""
+        await self.rate_limiter.acquire_async()
+        tasks = {asyncio.ensure_future(b.search(company_name, max_results)): b for b in self.backends}
+        seen = set()
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=deadline - asyncio.get_running_loop().time(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for task in done:
+                    backend = tasks.pop(task)
+                    if task.exception() is not None:
+                        print(f"Search backend {backend.name} failed: {task.exception()}")
+                        continue
+                    fresh = []
+                    for res in task.result():
+                        key = normalize_url(res.get("href")) or normalize_title(res.get("title"))
+                        if key not in seen:
+                            seen.add(key)
+                            fresh.append(res)
+                    if fresh:
+                        yield fresh
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def create_backend(spec: str = SEARCH_BACKEND) -> SearchBackend:
+    """Builds a backend from a spec such as `ddgs`, `stub`, `replay` or `fanout:ddgs,replay`."""
+    spec = spec.strip()
+    if spec.startswith("fanout:"):
+        return FanOutBackend([create_backend(s) for s in spec[len("fanout:"):].split(",") if s.strip()])
+    if spec == "ddgs":
+        return DDGSBackend()
+    if spec == "stub":
+        return StubBackend()
+    if spec == "replay":
+        if not SEARCH_REPLAY_PATH:
+            raise ValueError("SEARCH_BACKEND=replay needs SEARCH_REPLAY_PATH to point at a fixture file.")
+        record_from = create_backend(SEARCH_RECORD_FROM) if SEARCH_RECORD_FROM else None
+        return ReplayBackend(SEARCH_REPLAY_PATH, record_from=record_from)
+    raise ValueError(f"Unknown search backend {spec!r}.")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> SearchBackend:
+    """Returns the process-wide backend configured by SEARCH_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
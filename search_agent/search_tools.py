@@ -1,12 +1,216 @@
+import asyncio
+import atexit
+import contextvars
+import functools
 import json
 import os
-from ddgs import DDGS
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .job_identity import collapse_duplicates, make_job_id, normalize_company
+from .job_record import JobRecord, dumps_str
+from .job_store import DATA_DIR, get_store
+from .search_backends import get_backend
+from .telemetry import counter, stage
+
+SEARCH_CACHE_TTL = float(os.environ.get('SEARCH_CACHE_TTL', '600'))
+SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', '256'))
+# Set to a file path (or "default") to keep cached results across agent restarts
+SEARCH_CACHE_PATH = os.environ.get('SEARCH_CACHE_PATH', '')
+# Seconds between background writes of a changed cache file (and once more at exit)
+SEARCH_CACHE_FLUSH_INTERVAL = float(os.environ.get('SEARCH_CACHE_FLUSH_INTERVAL', '5'))
+# Global cap on concurrent upstream searches in batch mode (rate limits are per backend, see search_backends)
+SEARCH_BATCH_CONCURRENCY = int(os.environ.get('SEARCH_BATCH_CONCURRENCY', '4'))
+
+
+class SearchCache:
+    """Thread-safe TTL + LRU cache of search results (tuples of JobRecords) with in-flight coalescing.
+
+    Concurrent lookups for the same key share one upstream call: the first
+    caller computes the value while the others wait on its future.
+
+    With a `path`, the cache is written to disk by a background thread at
+    most every `flush_interval` seconds, and once more at exit, so lookups
+    never wait on file I/O.
+    """
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, maxsize: int = SEARCH_CACHE_SIZE, path: str = None,
+                 flush_interval: float = SEARCH_CACHE_FLUSH_INTERVAL):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.path = path
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher = None
+        self._flush_lock = threading.Lock()
+        if path:
+            self._load()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return normalize_company(query)
+
+    def get_or_compute(self, query: str, compute, cacheable=lambda value: True):
+        """Returns the cached value for `query`, computing it at most once per TTL.
+
+        Args:
+            query: The raw query; it is normalized before lookup.
+            compute: Zero-argument callable producing the value on a miss.
+            cacheable: Predicate deciding whether a computed value is stored.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        value, future, leader = self.claim(query)
+        if future is None:
+            return value
+        if not leader:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self.finish(query, future, error=e)
+            raise
+        self.finish(query, future, value, cacheable=cacheable)
+        return value
+
+    def claim(self, query: str) -> tuple:
+        """Looks up `query` for a caller that computes the value itself, e.g. while streaming it.
+
+        Returns:
+            A `(value, future, leader)` tuple. On a hit `future` is None and
+            `value` is the cached value. Otherwise `future` resolves to the
+            value: when `leader` is True the caller must compute it and pass
+            it to `finish`, else another caller is already computing it.
+        """
+        key = self.normalize(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cache_lookups.inc("hit")
+                return entry[1], None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                cache_lookups.inc("coalesced")
+                return None, future, False
+            self.misses += 1
+            cache_lookups.inc("miss")
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def finish(self, query: str, future: Future, value=None, error: BaseException = None,
+               cacheable=lambda value: True):
+        """Completes a computation started with `claim`, caching `value` unless it failed or isn't `cacheable`."""
+        key = self.normalize(query)
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is None and cacheable(value):
+                self._put_locked(key, value)
+        if error is None:
+            future.set_result(value)
+        else:
+            if not isinstance(error, Exception):
+                # Waiters should not see the leader's cancellation as their own
+                error = RuntimeError(f"Search for {query} was interrupted")
+            future.set_exception(error)
+
+    def put(self, query: str, value):
+        with self._lock:
+            self._put_locked(self.normalize(query), value)
+
+    def _put_locked(self, key: str, value):
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._mark_dirty()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._mark_dirty()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "size": len(self._entries),
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, expires_at, value in data:
+            # Entries written before results were cached as records hold JSON strings; drop them
+            if expires_at > now and isinstance(value, list):
+                self._entries[key] = (expires_at, tuple(JobRecord.from_dict(job) for job in value))
+
+    def _mark_dirty(self):
+        # Called with the lock held
+        if not self.path:
+            return
+        self._dirty = True
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="search_cache_flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Writes the cache file if the cache changed since the last write."""
+        if not self.path:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                now = time.time()
+                # Values are immutable tuples, so the snapshot can be serialized outside the lock
+                snapshot = [[k, exp, v] for k, (exp, v) in self._entries.items() if exp > now]
+            # Per-process temp name: several workers may persist the same cache file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(dumps_str(snapshot))
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Could not persist search cache to {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
+
+
+cache_lookups = counter("search_cache_total", "Search cache lookups by result.", ("result",))
+
+_cache_path = SEARCH_CACHE_PATH
+if _cache_path == "default":
+    _cache_path = os.path.join(DATA_DIR, "search_cache.json")
+search_cache = SearchCache(path=_cache_path or None)
 
-JOBS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'jobs')
-os.makedirs(JOBS_DIR, exist_ok=True)
 
 def search_jobs(company_name: str) -> str:
-    """Searches for jobs for a given company using DuckDuckGo and saves them locally.
+    """Searches for jobs for a given company using the configured search backend and saves them to the job store.
 
     Args:
         company_name: The name of the company to search jobs for.
@@ -14,53 +218,164 @@ def search_jobs(company_name: str) -> str:
     Returns:
         A JSON string containing the list of found jobs.
     """
-    print(f"Searching for jobs at {company_name}...")
-    results = []
     try:
-        with DDGS() as ddgs:
-            # simple search query
-            query = f"{company_name} careers jobs"
-            # We can use 'text' search or 'news', let's stick to text for simplicity
-            # or try to find a more specific way if DDGS supports it. 
-            # DDGS has 'text', 'images', 'videos', 'news', 'maps', 'translate', 'suggestions'.
-            # It doesn't have a specific 'jobs' search method publicly documented as stable/common in all versions, 
-            # but let's assume standard text search is good enough to find *links* to jobs.
-            
-            # Actually, let's try to extract something reasonable.
-            search_results = list(ddgs.text(query, max_results=10))
-            print(f"DDGS returned {len(search_results)} results.")
-            
-            if not search_results:
-                print("No results found or error in retrieval. Using MOCK data.")
-                # Fallback to mock data for demonstration
-                search_results = [
-                    {'title': f'{company_name} Software Engineer', 'body': 'Job description placeholder...', 'href': 'http://example.com/job1'},
-                    {'title': f'{company_name} Data Scientist', 'body': 'Job description placeholder...', 'href': 'http://example.com/job2'},
-                ]
-                
-            for i, res in enumerate(search_results):
-                job_id = f"{company_name.lower().replace(' ', '_')}_{i}"
-                job = {
-                    "id": job_id,
-                    "title": res.get("title"),
-                    "company": company_name,
-                    "description": res.get("body"),
-                    "url": res.get("href")
-                }
-                results.append(job)
-                
-                # Save to file
-                job_file = os.path.join(JOBS_DIR, f"{job_id}.json")
-                with open(job_file, "w") as f:
-                    json.dump(job, f, indent=2)
-                    
+        # Failures raise out of the cache and empty results are not stored, so neither sticks for the TTL
+        jobs = search_cache.get_or_compute(company_name, lambda: _search_jobs_uncached(company_name),
+                                           cacheable=bool)
     except Exception as e:
         return f"Error searching for jobs: {e}"
+    return dumps_str(jobs)
 
-    return json.dumps(results, indent=2)
+def _search_jobs_uncached(company_name: str) -> tuple:
+    # Save all new or changed jobs in one transaction
+    return tuple(_store_new_jobs(_fetch_jobs(company_name)))
+
+def _fetch_jobs(company_name: str) -> list:
+    """Queries the configured search backend for a company's job listings without storing them."""
+    print(f"Searching for jobs at {company_name}...")
+    return collapse_duplicates(_to_jobs(company_name, get_backend().search_sync(company_name)))
+
+def _to_jobs(company_name: str, search_results: list) -> list:
+    results = []
+    for res in search_results:
+        # Content-addressed ID: the same posting keeps its ID across searches and result orders
+        job_id = make_job_id(company_name, res.get("href"), res.get("title"))
+        results.append(JobRecord(job_id, res.get("title"), company_name, res.get("body"), res.get("href")))
+    return results
+
+def _store_new_jobs(jobs: list) -> list:
+    store = get_store()
+    jobs = store.resolve_duplicates(jobs)
+    with stage("job_store.upsert", jobs=len(jobs)):
+        store.upsert_jobs(jobs)
+    return jobs
+
+async def iter_search_jobs(company_name: str, executor=None):
+    """Searches for a company's jobs, yielding each chunk as soon as it is stored.
+
+    A cached result is yielded as one chunk, and so is the result of an
+    identical search already in flight, once it completes. Otherwise every
+    chunk the search backend returns (one per source for a fan-out backend)
+    is deduplicated against earlier chunks, saved in one transaction and
+    yielded. A non-empty full result is cached at the end, like `search_jobs`.
+
+    Args:
+        company_name: The name of the company to search jobs for.
+        executor: Where store writes run; None means the loop's default executor.
+
+    Yields:
+        Lists of JobRecords.
+    """
+    cached, future, leader = search_cache.claim(company_name)
+    if future is None:
+        yield list(cached)
+        return
+    if not leader:
+        # The same search is already streaming; wait for its full result
+        # Shielded: a waiter timing out must not cancel the shared future under the leader
+        yield list(await asyncio.shield(asyncio.wrap_future(future)))
+        return
+    print(f"Searching for jobs at {company_name}...")
+    kept = []
+    try:
+        async for search_results in get_backend().stream(company_name):
+            # collapse_duplicates keeps the first of each group, so `kept` survives as the prefix
+            fresh = collapse_duplicates(kept + _to_jobs(company_name, search_results))[len(kept):]
+            if not fresh:
+                continue
+            store = functools.partial(contextvars.copy_context().run, _store_new_jobs, fresh)
+            fresh = await asyncio.get_running_loop().run_in_executor(executor, store)
+            kept.extend(fresh)
+            yield fresh
+    except BaseException as e:
+        search_cache.finish(company_name, future, error=e)
+        raise
+    search_cache.finish(company_name, future, tuple(kept), cacheable=bool)
+
+def refresh_jobs(company_name: str) -> dict:
+    """Re-crawls a company, bypassing the search cache, and brings the store up to date.
+
+    Only new or changed postings are written. Stored open jobs the crawl no
+    longer returns are marked closed, unless the crawl came back empty, which
+    is more likely a backend failure than every posting vanishing at once.
+
+    Args:
+        company_name: The company to re-crawl.
+
+    Returns:
+        `{"found", "changed", "closed"}` job counts, plus the crawled JobRecords as `jobs`.
+    """
+    store = get_store()
+    jobs = store.resolve_duplicates(_fetch_jobs(company_name))
+    with stage("job_store.upsert", jobs=len(jobs)):
+        changed = store.upsert_jobs(jobs)
+    closed = store.close_missing(company_name, [job.id for job in jobs]) if jobs else 0
+    if jobs:
+        search_cache.put(company_name, tuple(jobs))
+    return {"found": len(jobs), "changed": changed, "closed": closed, "jobs": jobs}
+
+_batch_pool = ThreadPoolExecutor(max_workers=SEARCH_BATCH_CONCURRENCY, thread_name_prefix='search_batch')
+
+def iter_search_jobs_batch(company_names: list):
+    """Searches many companies concurrently, yielding each result as it finishes.
+
+    Upstream searches share the global SEARCH_BATCH_CONCURRENCY pool and the
+    backend's rate limit, and go through the result cache. All new or changed
+    jobs are stored in one transaction once the batch completes.
+
+    Args:
+        company_names: Companies to search; duplicates, in any letter case, are searched once.
+
+    Yields:
+        `(company, jobs, error)` tuples, where `jobs` is a list of JobRecords and
+        `error` is None on success.
+    """
+    def fetch(company):
+        # Cached like `search_jobs`: mirrors already resolved onto their stored originals
+        return search_cache.get_or_compute(
+            company, lambda: tuple(get_store().resolve_duplicates(_fetch_jobs(company))), cacheable=bool
+        )
+
+    # "Acme" and " acme " share a cache entry, so they are searched once, under the first spelling
+    companies = {}
+    for company in company_names:
+        if company and company.strip():
+            companies.setdefault(normalize_company(company), company.strip())
+    companies = list(companies.values())
+    # Each worker runs in a copy of the caller's context so its spans join the caller's trace
+    futures = {_batch_pool.submit(contextvars.copy_context().run, fetch, company): company for company in companies}
+    all_jobs = []
+    try:
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                jobs = list(future.result())
+            except Exception as e:
+                yield company, [], f"Error searching for jobs: {e}"
+                continue
+            all_jobs.extend(jobs)
+            yield company, jobs, None
+    finally:
+        if all_jobs:
+            with stage("job_store.upsert", jobs=len(all_jobs)):
+                get_store().upsert_jobs(all_jobs)
+
+def search_jobs_batch(company_names: list[str]) -> str:
+    """Searches for jobs at several companies at once and saves them to the job store.
+
+    Args:
+        company_names: The names of the companies to search jobs for.
+
+    Returns:
+        A JSON string mapping each company to its list of found jobs or an error message.
+    """
+    results = {}
+    for company, jobs, error in iter_search_jobs_batch(company_names):
+        results[company] = error or jobs
+    return dumps_str(results)
 
 def get_job_details(job_id: str) -> str:
-    """Retrieves details for a specific job ID from local storage.
+    """Retrieves details for a specific job ID from the job store.
 
     Args:
         job_id: The ID of the job to retrieve.
@@ -68,8 +383,30 @@ def get_job_details(job_id: str) -> str:
     Returns:
         JSON string of the job details or an error message.
     """
-    job_file = os.path.join(JOBS_DIR, f"{job_id}.json")
-    if os.path.exists(job_file):
-        with open(job_file, "r") as f:
-            return f.read()
+    job = lookup_jobs([job_id])["jobs"].get(job_id)
+    if job is not None:
+        return dumps_str(job)
     return f"Job with ID {job_id} not found."
+
+def get_jobs_details(job_ids: list[str]) -> str:
+    """Retrieves details for several job IDs from the job store in one lookup.
+
+    Args:
+        job_ids: The IDs of the jobs to retrieve.
+
+    Returns:
+        A JSON string with the found jobs keyed by ID and the list of missing IDs.
+    """
+    return dumps_str(lookup_jobs(job_ids))
+
+def lookup_jobs(job_ids: list) -> dict:
+    """Returns `{"jobs": {id: job_dict}, "missing": [ids]}` for `get_jobs_details` and its direct callers.
+
+    Jobs whose page has been fetched carry the extracted posting text as `page_text`.
+    """
+    store = get_store()
+    jobs = store.get_jobs(job_ids)
+    for job_id, page in store.get_pages(list(jobs)).items():
+        if page["text"]:
+            jobs[job_id]["page_text"] = page["text"]
+    return {"jobs": jobs, "missing": [j for j in job_ids if j not in jobs]}
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Set by run_server so worker processes (and the stores they open) know they share state
+WORKERS_ENV = 'SEARCHJOBS_WORKERS'
+
+_PROBE = """
+import time
+start = time.perf_counter()
+from {module} import {func}
+imported = time.perf_counter()
+{func}()
+built = time.perf_counter()
+print(f"{{imported - start:.6f}} {{built - imported:.6f}}")
+"""
+
+
+def profile_startup(module: str, func: str = "build_app", top: int = 20):
+    """Prints what it costs to import `module` and call `func` to build the server app.
+
+    The probe runs in a fresh interpreter with `-X importtime`, so modules
+    already loaded in this process don't hide their cost. Import time is
+    summed per top-level package (e.g. all of `a2a.*`), which shows which
+    dependency a cold start is paying for.
+    """
+    probe = _PROBE.format(module=module, func=func)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                          capture_output=True, text=True, env=env, cwd=ROOT)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"Startup probe for {module} failed (exit code {proc.returncode}).")
+
+    per_package = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        count, total = per_package.get(package, (0, 0))
+        per_package[package] = (count + 1, total + int(self_us))
+    ranked = sorted(per_package.items(), key=lambda item: item[1][1], reverse=True)
+
+    import_s, build_s = (float(x) for x in proc.stdout.split()[-2:])
+    print(f"Startup profile for {module}.{func}()")
+    print(f"{'import ms':>10} {'modules':>8}  package")
+    for package, (count, total_us) in ranked[:top]:
+        print(f"{total_us / 1000:10.1f} {count:8d}  {package}")
+    print(f"\nimport: {import_s * 1000:.1f} ms, {func}(): {build_s * 1000:.1f} ms, "
+          f"total: {(import_s + build_s) * 1000:.1f} ms")
+
+
+def worker_count() -> int:
+    """Number of worker processes serving this app (1 unless started with --workers)."""
+    return max(1, int(os.environ.get(WORKERS_ENV, '1')))
+
+
+def run_server(target: str, host: str, port: int, workers: int = 1, factory: bool = False, app=None):
+    """Serves an ASGI app with one or more uvicorn worker processes.
+
+    Workers share the listening socket and keep all state that must be
+    visible across them (tasks, sessions, jobs, applications) on disk.
+
+    Args:
+        target: Import string of the app, e.g. `bridge:app`, or of its factory.
+        host: Interface to bind.
+        port: Port to bind.
+        workers: Worker processes; 0 means one per CPU core.
+        factory: Whether `target` is a zero-argument factory returning the app.
+        app: The app, or with `factory` its factory, from the calling module.
+            A single worker serves it in-process instead of importing
+            `target`, so a module run as a script isn't imported twice.
+    """
+    import uvicorn
+
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    os.environ[WORKERS_ENV] = str(workers)
+    if workers == 1:
+        if app is None:
+            uvicorn.run(target, host=host, port=port, factory=factory)
+        else:
+            uvicorn.run(app() if factory else app, host=host, port=port)
+        return
+    print(f"Starting {workers} workers for {target} on {host}:{port}.")
+    uvicorn.run(target, host=host, port=port, workers=workers, factory=factory)
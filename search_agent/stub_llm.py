@@ -0,0 +1,68 @@
+import json
+import os
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field
+
+from .llm import normalize_prompt
+
+# JSON file mapping normalized prompts to {"tool": name, "args": {...}} or {"text": "..."}
+LLM_STUB_PATH = os.environ.get('LLM_STUB_PATH', '')
+
+
+def _estimate_tokens(text: str) -> int:
+    # Roughly four characters per token, like Gemini on English text
+    return len(text) // 4 + 1
+
+
+class StubLlm(BaseLlm):
+    """Deterministic offline stand-in for Gemini, selected with LLM_MODEL=stub.
+
+    A prompt listed in `responses` gets its scripted tool call or text;
+    any other prompt is echoed back. After a tool call the stub answers with
+    a short summary of the tool's result. Token usage is estimated from the
+    text, so the budget and cache paths can be exercised without an API key.
+    """
+
+    model: str = "stub"
+    responses: dict = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str = LLM_STUB_PATH) -> "StubLlm":
+        """Builds a stub with the scripted responses in `path` (none if the path is empty)."""
+        if not path:
+            return cls()
+        with open(path, "r") as f:
+            return cls(responses={normalize_prompt(k): v for k, v in json.load(f).items()})
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        contents = llm_request.contents or []
+        parts = (contents[-1].parts or []) if contents else []
+        results = [p.function_response for p in parts if p.function_response]
+        if results:
+            reply = types.Part(text="; ".join(f"{r.name} returned {str(r.response)[:200]}" for r in results))
+        else:
+            prompt = "".join(p.text for p in parts if p.text)
+            rule = self.responses.get(normalize_prompt(prompt), {})
+            if rule.get("tool") in llm_request.tools_dict:
+                reply = types.Part(function_call=types.FunctionCall(name=rule["tool"], args=rule.get("args", {})))
+            else:
+                reply = types.Part(text=rule.get("text") or f"(stub) {prompt}")
+
+        prompt_tokens = sum(_estimate_tokens(str(p.text or p.function_response or ""))
+                            for c in contents for p in (c.parts or []))
+        output_tokens = _estimate_tokens(reply.text or str(reply.function_call))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[reply]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
@@ -0,0 +1,83 @@
+import argparse
+import hashlib
+import html
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .search_backends import STUB_ROLES
+
+
+class StubPageHandler(BaseHTTPRequestHandler):
+    """Serves a deterministic job page for every `/<company-slug>/<n>` path the stub backend links to.
+
+    Pages carry an ETag and a Last-Modified header and answer conditional
+    requests with 304, like a well-behaved job board. The server's
+    `revision` is part of every page, so bumping it simulates edited postings.
+    """
+
+    server_version = "StubPages/0.1"
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or not parts[1].isdigit() or int(parts[1]) >= len(STUB_ROLES):
+            self.send_error(404)
+            return
+        company = parts[0].replace("-", " ").title()
+        role = STUB_ROLES[int(parts[1])]
+        body = self.render(company, role).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        last_modified = formatdate(self.server.started_at, usegmt=True)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def render(self, company: str, role: str) -> str:
+        company, role = html.escape(company), html.escape(role)
+        return f"""<!doctype html>
+<html><head><title>{role} at {company}</title><style>body {{ font-family: sans-serif; }}</style></head>
+<body>
+<header><nav><a href="/">Jobs</a> | <a href="/about">About</a></nav></header>
+<main>
+<h1>{role}</h1>
+<p>{company} is hiring a {role} (revision {self.server.revision}).</p>
+<h2>Responsibilities</h2>
+<ul><li>Design, build and run {company} services in Python.</li><li>Own features from idea to production.</li></ul>
+<h2>Requirements</h2>
+<ul><li>3+ years of Python and cloud experience.</li><li>Clear written communication and teamwork.</li></ul>
+</main>
+<footer>&copy; {company}. All rights reserved.</footer>
+<script>console.log("tracking");</script>
+</body></html>
+"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, revision: int = 0) -> ThreadingHTTPServer:
+    """Creates the stub page server; call `serve_forever()` on the result (or run it in a thread)."""
+    server = ThreadingHTTPServer((host, port), StubPageHandler)
+    server.started_at = time.time()
+    server.revision = revision
+    return server
+
+
+if __name__ == "__main__":
+    # python -m search_agent.stub_pages, with ENRICH_ENABLED=1 SEARCH_BACKEND=stub SEARCH_STUB_URL=http://127.0.0.1:8765
+    parser = argparse.ArgumentParser(description="Offline job pages for the stub search backend")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--revision", type=int, default=0, help="Changes every page, e.g. to test refetches")
+    args = parser.parse_args()
+    server = serve(port=args.port, revision=args.revision)
+    print(f"Serving stub job pages on http://127.0.0.1:{args.port}")
+    server.serve_forever()
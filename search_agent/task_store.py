@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task
+
+from .job_store import DATA_DIR
+from .startup import worker_count
+
+# "sqlite" (default) keeps tasks across restarts; "memory" is the SDK's unbounded InMemoryTaskStore
+TASK_STORE = os.environ.get('TASK_STORE', 'sqlite')
+# Finished tasks are deleted this many seconds after their last update (0 = keep forever)
+TASK_TTL = float(os.environ.get('TASK_TTL', str(7 * 24 * 3600)))
+TASK_CACHE_SIZE = int(os.environ.get('TASK_CACHE_SIZE', '1024'))
+# "sqlite" (default) keeps ADK sessions, memory and artifacts on disk; "memory" uses ADK's in-memory services
+SESSION_STORE = os.environ.get('SESSION_STORE', 'sqlite')
+
+TERMINAL_STATES = ('completed', 'canceled', 'failed', 'rejected')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    context_id TEXT,
+    state TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_context_id ON tasks(context_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_state_updated_at ON tasks(state, updated_at);
+"""
+
+
+class SqliteTaskStore(TaskStore):
+    """Persistent A2A task store: SQLite on disk with an LRU cache in front.
+
+    Memory stays flat because only `cache_size` tasks are held in process, and
+    the database stays bounded because finished tasks expire after `ttl`
+    seconds. Tasks survive restarts and can be queried afterwards. With
+    `cache_size=0` every read goes to SQLite, so several worker processes
+    can share one database.
+    """
+
+    def __init__(self, db_path: str, ttl: float = TASK_TTL, cache_size: int = TASK_CACHE_SIZE,
+                 evict_interval: float = 60.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.evict_interval = evict_interval
+        self._cache = OrderedDict()
+        self._local = threading.local()
+        self._last_evict = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, task: Task):
+        self._cache[task.id] = task
+        self._cache.move_to_end(task.id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _save_sync(self, task: Task):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, context_id, state, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (task.id, task.context_id, self._state(task), task.model_dump_json(exclude_none=True), now),
+            )
+            if self.ttl and now - self._last_evict > self.evict_interval:
+                self._last_evict = now
+                placeholders = ", ".join("?" * len(TERMINAL_STATES))
+                conn.execute(
+                    f"DELETE FROM tasks WHERE state IN ({placeholders}) AND updated_at < ?",
+                    (*TERMINAL_STATES, now - self.ttl),
+                )
+
+    def _get_sync(self, task_id: str):
+        row = self._conn().execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return Task.model_validate_json(row[0]) if row else None
+
+    def _delete_sync(self, task_id: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    @staticmethod
+    def _state(task: Task) -> str:
+        state = task.status.state
+        return getattr(state, "value", state)
+
+    async def save(self, task: Task, context=None) -> None:
+        self._remember(task)
+        await asyncio.to_thread(self._save_sync, task)
+
+    async def get(self, task_id: str, context=None):
+        task = self._cache.get(task_id)
+        if task is not None:
+            self._cache.move_to_end(task_id)
+            return task
+        task = await asyncio.to_thread(self._get_sync, task_id)
+        if task is not None:
+            self._remember(task)
+        return task
+
+    async def delete(self, task_id: str, context=None) -> None:
+        self._cache.pop(task_id, None)
+        await asyncio.to_thread(self._delete_sync, task_id)
+
+
+def create_task_store(agent_name: str, kind: str = TASK_STORE) -> TaskStore:
+    """Builds the task store selected by `kind` (the TASK_STORE setting).
+
+    Args:
+        agent_name: Short agent name; each agent gets its own `data/<name>_tasks.db`.
+        kind: `sqlite` or `memory`.
+
+    Returns:
+        A TaskStore for the agent's DefaultRequestHandler.
+    """
+    if kind == "memory":
+        return InMemoryTaskStore()
+    if kind != "sqlite":
+        raise ValueError(f"Unknown TASK_STORE {kind!r}; expected 'sqlite' or 'memory'.")
+    db_path = os.path.join(DATA_DIR, f"{agent_name}_tasks.db")
+    if worker_count() > 1:
+        # Another worker may have updated any task, so the in-process cache would serve stale copies
+        return SqliteTaskStore(db_path, cache_size=0)
+    return SqliteTaskStore(db_path)
+
+
+def create_runner_services(agent_name: str) -> dict:
+    """Builds the session, artifact and memory services for an agent's ADK Runner.
+
+    By default sessions and long-term memory go to `data/<name>_sessions.db`
+    and artifacts to `data/<name>_artifacts/`, all bounded by TTLs and size
+    caps (see search_agent.adk_services). A restart picks up where it left
+    off, and with several workers a conversation can continue on whichever
+    worker takes the next request; the in-memory session tier is then off.
+
+    Args:
+        agent_name: Short agent name, e.g. `search`.
+
+    Returns:
+        Keyword arguments for `google.adk.Runner`.
+    """
+    # Imported here: google.adk is only loaded once the LLM path runs
+    if SESSION_STORE == 'memory':
+        from google.adk.artifacts import InMemoryArtifactService
+        from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+        from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+        return {
+            "artifact_service": InMemoryArtifactService(),
+            "session_service": InMemorySessionService(),
+            "memory_service": InMemoryMemoryService(),
+        }
+    from .adk_services import SESSION_CACHE_SIZE, FileArtifactService, SqliteMemoryService, SqliteSessionService
+
+    db_path = os.path.join(DATA_DIR, f"{agent_name}_sessions.db")
+    cache_size = SESSION_CACHE_SIZE if worker_count() == 1 else 0
+    return {
+        "artifact_service": FileArtifactService(os.path.join(DATA_DIR, f"{agent_name}_artifacts")),
+        "session_service": SqliteSessionService(db_path, cache_size=cache_size),
+        "memory_service": SqliteMemoryService(db_path),
+    }
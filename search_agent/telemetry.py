@@ -0,0 +1,253 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Counters and per-stage latency histograms, served as Prometheus text on /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+# Print one JSON line per finished span and propagate the W3C traceparent header across A2A calls
+TRACE_ENABLED = os.environ.get('TRACE_ENABLED', '0') == '1'
+METRICS_PREFIX = 'searchjobs_'
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NULL = nullcontext()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(self.labelnames, k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labels, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, inf)} {row[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {row[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {row[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labelnames: tuple):
+        name = METRICS_PREFIX + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._get(Counter, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = ()) -> Histogram:
+        return self._get(Histogram, name, help_text, labelnames)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("stage_duration_seconds", "Time spent per processing stage.", ("stage",))
+STAGE_ERRORS = REGISTRY.counter("stage_errors_total", "Stages that raised an exception.", ("stage",))
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests served.", ("route", "status"))
+HTTP_SECONDS = REGISTRY.histogram("http_request_duration_seconds", "HTTP request time, including streamed bodies.", ("route",))
+
+
+def counter(name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+    """Returns the process-wide counter `searchjobs_<name>`, creating it on first use."""
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+# (trace_id, span_id) of the innermost active span
+_current_span = contextvars.ContextVar('searchjobs_span', default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class _Stage:
+    __slots__ = ("name", "attrs", "start", "token", "span")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.token = None
+        if TRACE_ENABLED:
+            parent = _current_span.get()
+            self.span = (parent[0] if parent else _new_id(16), _new_id(8), parent[1] if parent else None)
+            self.token = _current_span.set(self.span[:2])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.name)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.name)
+        if self.token is not None:
+            _current_span.reset(self.token)
+            trace_id, span_id, parent_id = self.span
+            print(json.dumps({
+                "trace_id": trace_id, "span_id": span_id, "parent_id": parent_id, "name": self.name,
+                "duration_ms": round(elapsed * 1000, 3), "error": exc_type.__name__ if exc_type else None,
+                **self.attrs,
+            }), flush=True)
+        return False
+
+
+def stage(name: str, **attrs):
+    """Times a block as `name` in the stage histogram and, with tracing on, as a span.
+
+    Usage: `with stage("search.backend.ddgs", company=name): ...`. Keyword
+    attributes only appear on the span, never as metric labels. With metrics
+    and tracing both disabled this returns a shared no-op context manager.
+    """
+    if not (METRICS_ENABLED or TRACE_ENABLED):
+        return _NULL
+    return _Stage(name, attrs)
+
+
+def traceparent():
+    """W3C `traceparent` value for the active span, or None when not tracing."""
+    span = _current_span.get() if TRACE_ENABLED else None
+    if span is None:
+        return None
+    return f"00-{span[0]}-{span[1]}-01"
+
+
+def trace_headers() -> dict:
+    """HTTP headers carrying the active trace context to another agent (empty when not tracing)."""
+    header = traceparent()
+    return {"traceparent": header} if header else {}
+
+
+@contextmanager
+def continue_trace(header):
+    """Makes spans inside the block children of a remote `traceparent`, if one is given."""
+    token = None
+    if TRACE_ENABLED and header:
+        parts = header.split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            token = _current_span.set((parts[1], parts[2]))
+    try:
+        yield
+    finally:
+        if token is not None:
+            _current_span.reset(token)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route.
+
+    An incoming `traceparent` header becomes the parent of the request's spans.
+    """
+
+    def __init__(self, app, name: str):
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (METRICS_ENABLED or TRACE_ENABLED):
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        header = None
+        if TRACE_ENABLED:
+            header = next((v.decode("latin-1") for k, v in scope.get("headers", ()) if k == b"traceparent"), None)
+        try:
+            with continue_trace(header), (_Stage(f"{self.name}.http", {"path": scope.get("path")}) if TRACE_ENABLED else _NULL):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            # Unknown paths share one label so scanners can't blow up the series count
+            route = getattr(scope.get("route"), "path", None) or (scope["path"] if status != 404 else "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, route)
+            HTTP_REQUESTS.inc(route, str(status))
+
+
+async def metrics_endpoint(request):
+    """Starlette endpoint serving the registry in Prometheus text format."""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
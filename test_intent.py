@@ -0,0 +1,42 @@
+from search_agent.intent import parse_intent
+from search_agent.job_identity import make_job_id
+
+# Company slugs keep punctuation, so IDs like these reach the intent parser
+ODD_IDS = [
+    make_job_id("AT&T", "https://att.jobs/1", "Engineer"),
+    make_job_id("Procter & Gamble", "https://pg.com/careers/2", "Engineer"),
+    make_job_id("McDonald's", "https://careers.mcdonalds.com/3", "Engineer"),
+]
+
+
+def test_odd_job_ids():
+    for job_id in ODD_IDS:
+        intent = parse_intent(f"Apply for job ID {job_id} using my_resume.txt")
+        assert intent.action == "apply" and intent.job_ids == (job_id,) and intent.resume == "my_resume.txt"
+        intent = parse_intent(f"Get details for job IDs: {job_id}.")
+        assert intent.action == "job_details" and intent.job_ids == (job_id,)
+    intent = parse_intent(f"Apply for job IDs {', '.join(ODD_IDS)} using my_resume.txt")
+    assert intent.action == "apply_bulk" and intent.job_ids == tuple(ODD_IDS)
+    intent = parse_intent(f"Get details for job IDs: {', '.join(ODD_IDS)}")
+    assert intent.job_ids == tuple(ODD_IDS)
+
+
+def test_resume_names_with_spaces():
+    intent = parse_intent("Apply for job ID google_1 using My Resume 2024.txt.")
+    assert intent.resume == "My Resume 2024.txt"
+    intent = parse_intent("Apply for job IDs google_1, google_2 using my resume.txt")
+    assert intent.job_ids == ("google_1", "google_2") and intent.resume == "my resume.txt"
+    intent = parse_intent("Rank top 5 jobs for resume my resume.txt")
+    assert intent.resume == "my resume.txt" and intent.top_k == 5
+
+
+def test_apply_without_resume():
+    intent = parse_intent("Apply for job ID google_1")
+    assert intent.action == "apply" and intent.job_ids == ("google_1",) and intent.resume is None
+
+
+if __name__ == "__main__":
+    test_odd_job_ids()
+    test_resume_names_with_spaces()
+    test_apply_without_resume()
+    print("Intent parsing OK.")
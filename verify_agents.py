@@ -8,6 +8,8 @@ import httpx
 import asyncio
 from a2a.client import A2ACardResolver, A2AClient
 from a2a.types import AgentCard, SendMessageRequest, MessageSendParams, SendMessageSuccessResponse
+from apply_agent.application_store import get_application_store
+from search_agent.job_store import get_store
 
 # Set environment
 env = os.environ.copy()
@@ -56,6 +58,22 @@ async def send_message_to_agent(agent_url, text):
             f.write(f"Error connecting to {agent_url}: {e}\n")
         return None
 
+async def wait_until_ready(agent_url, timeout=60.0):
+    # Poll the agent card instead of sleeping a fixed time
+    card_url = f"{agent_url.rstrip('/')}/.well-known/agent-card.json"
+    start = time.time()
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while time.time() - start < timeout:
+            try:
+                if (await client.get(card_url)).status_code == 200:
+                    print(f"{agent_url} ready after {time.time() - start:.1f}s")
+                    return True
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    print(f"{agent_url} not ready after {timeout:.0f}s")
+    return False
+
 async def main():
     print("Starting Search Agent...")
     search_out_f = open("search_stdout.log", "w")
@@ -80,8 +98,9 @@ async def main():
     )
     
     try:
-        print("Waiting for agents to start (30s)...")
-        await asyncio.sleep(30)
+        print("Waiting for agents to start...")
+        for url in ("http://127.0.0.1:10001", "http://127.0.0.1:10002"):
+            await wait_until_ready(url)
         
         # Test Search Agent
         print("\n--- Testing Search Agent ---")
@@ -90,12 +109,11 @@ async def main():
             print("Search Agent Response Received")
             # Verify jobs created
             await asyncio.sleep(5)
-            jobs_dir = "data/jobs"
-            files = os.listdir(jobs_dir) if os.path.exists(jobs_dir) else []
-            print(f"Jobs found in {jobs_dir}: {len(files)}")
-            if len(files) > 0:
-                print("SUCCESS: Search Agent created job files.")
-                job_id = files[0].replace(".json", "")
+            jobs = get_store().list_jobs()
+            print(f"Jobs found in {get_store().db_path}: {len(jobs)}")
+            if len(jobs) > 0:
+                print("SUCCESS: Search Agent stored jobs.")
+                job_id = jobs[0]["id"]
                 print(f"Using Job ID: {job_id}")
                 
                 # Test Apply Agent
@@ -107,15 +125,15 @@ async def main():
                     print("Apply Agent Response Received")
                     # Verify application created
                     await asyncio.sleep(5)
-                    app_file = f"data/resumes/application_{job_id}.txt"
-                    if os.path.exists(app_file):
-                        print(f"SUCCESS: Application file {app_file} created.")
+                    applications, _ = get_application_store().list_page(job_id=job_id)
+                    if applications:
+                        print(f"SUCCESS: Application {applications[0]['id']} recorded for {job_id}.")
                     else:
-                        print(f"FAILURE: Application file {app_file} NOT found.")
+                        print(f"FAILURE: No application recorded for {job_id}.")
                 else:
                     print("FAILURE: Apply Agent did not respond.")
             else:
-                print("FAILURE: Search Agent did not create job files.")
+                print("FAILURE: Search Agent did not store any jobs.")
         else:
             print("FAILURE: Search Agent did not respond.")
             